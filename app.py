@@ -1,17 +1,83 @@
 from shiny import App, ui, render, reactive
+import sys
 import pandas as pd
 import numpy as np
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
 from pathlib import Path
-import plotly.express as px
 from shinywidgets import output_widget, render_widget
-from load_data import get_daily_load
-from performance import calculate_predictions, get_race_pace_history, get_pace_string
+from functools import partial
+from urllib.parse import parse_qs
+from catalog import DEFAULT_ATHLETE, configured_athletes
+import pmc
+import snapshot
+from downsample import downsample
+from rollup import RESOLUTIONS, RollupCube
+import metrics
+from memo import SharedCache
+from watch import ActivityWatcher
+from best_efforts import BestEffortIndex
+from performance import PREDICTION_WINDOW_DAYS, format_predictions, get_pace_string, prediction_window
 
 # Load data
-df_load = get_daily_load()
-df_load["date"] = pd.to_datetime(df_load["date"])
+# In the browser (Shinylive/Pyodide) the data comes only from the bundle staged
+# next to the app by bundle.py; the raw activities aren't there to ingest.
+IN_BROWSER = sys.platform == "emscripten"
+
+def open_dataset(activities_dir):
+    """
+    Reactive snapshot data for one activity archive, shared by all its sessions.
+
+    Serves the precomputed snapshot straight away; without one (first run) it
+    ingests now. New or changed activity files, including any that arrived while
+    the app was down, are ingested incrementally in the background and the
+    snapshot rewritten, which invalidates the calcs built on it in every session.
+    """
+    path = snapshot.snapshot_path(activities_dir)
+    startup_data = snapshot.read_snapshot(path)
+    if startup_data is None:
+        snapshot.write_snapshot(activities_dir=activities_dir)
+        startup_data = snapshot.read_snapshot(path)
+
+    watcher = ActivityWatcher(
+        partial(snapshot.write_snapshot, activities_dir=activities_dir),
+        built=None if startup_data is None else str(startup_data["source"]),
+        activities_dir=activities_dir,
+    )
+    watcher.start()
+
+    @reactive.file_reader(path, session=None)
+    def dataset():
+        return snapshot.read_snapshot(path)
+    return dataset
+
+if IN_BROWSER:
+    ATHLETES = {DEFAULT_ATHLETE: None}
+
+    @reactive.file_reader(snapshot.BUNDLE_PATH, session=None)
+    def _bundle_data():
+        return snapshot.read_snapshot(snapshot.BUNDLE_PATH)
+    DATASETS = {DEFAULT_ATHLETE: _bundle_data}
+else:
+    ATHLETES = configured_athletes()
+    DATASETS = {name: open_dataset(activities_dir) for name, activities_dir in ATHLETES.items()}
+
+# Results every session can reuse (trends per CTL/ATL pair, pace history, ...),
+# keyed on athlete and data version so a rebuilt snapshot never serves stale ones
+SHARED_RESULTS = SharedCache()
+
+# Value of the sport select that sums every sport type
+ALL_SPORTS = "All"
+
+def pmc_state_path(athlete, sport, ctl_days, atl_days):
+    """
+    CTL/ATL checkpoint kept next to the catalog so new days resume the recurrence,
+    for the default time constants of each sport only. Other pairs are computed in
+    full: SHARED_RESULTS already keeps each per data version, and a checkpoint per
+    slider position would pile up on disk. None in the browser, where nothing
+    persists between visits.
+    """
+    if IN_BROWSER or (ctl_days, atl_days) != (pmc.DEFAULT_CTL_DAYS, pmc.DEFAULT_ATL_DAYS):
+        return None
+    return snapshot.trends_state_path(ATHLETES[athlete], None if sport == ALL_SPORTS else sport)
 
 app_ui = ui.page_fluid(
     ui.head_content(
@@ -28,6 +94,23 @@ app_ui = ui.page_fluid(
                 {"class": "card p-3 mb-3"},
                 ui.output_ui("latest_values"),
                 
+            ),
+            ui.div(
+                {"class": "card p-3 mb-3"},
+                ui.input_slider("ctl_days", "Fitness (CTL) Days", min=pmc.FIT_CTL_DAYS[0], max=pmc.FIT_CTL_DAYS[1], value=pmc.DEFAULT_CTL_DAYS),
+                ui.input_slider("atl_days", "Fatigue (ATL) Days", min=pmc.FIT_ATL_DAYS[0], max=pmc.FIT_ATL_DAYS[1], value=pmc.DEFAULT_ATL_DAYS),
+                ui.input_action_button("fit_model", "Fit to Pace History", class_="btn-sm btn-outline-primary w-100"),
+                ui.output_ui("fit_summary"),
+            ),
+            ui.div(
+                {"class": "card p-3 mb-3"},
+                # Choices are filled in from the athlete's activities
+                ui.input_select("sport", "Sport", choices=[ALL_SPORTS]),
+                ui.input_radio_buttons(
+                    "resolution", "Load Totals",
+                    dict(zip(RESOLUTIONS, ["Daily", "Weekly", "Monthly", "Yearly"])),
+                    inline=True,
+                ),
             ),
              
                  ui.output_ui("performance_metrics"),
@@ -44,185 +127,183 @@ app_ui = ui.page_fluid(
         ),
 
         output_widget("plot"),
+        # Filled only with ?debug=1
+        ui.output_ui("perf_panel"),
     )
 )
 
+def pace_frame(data):
+    """Race pace history of a snapshot as a DataFrame, None if there are no qualifying runs."""
+    if len(data["pace_date"]) == 0:
+        return None
+    df_pace = pd.DataFrame({"date": pd.to_datetime(data["pace_date"]), "speed_mps": data["pace_speed"]})
+    # Convert m/s to min/km (float minutes) for plotting
+    df_pace["pace_min"] = (1000 / df_pace["speed_mps"]) / 60
+    return df_pace
+
+def rolling_best_frame(index, end):
+    """
+    Trailing PREDICTION_WINDOW_DAYS best pace up to end, reduced to the days
+    around each change. None if there are no qualifying runs.
+    """
+    if len(index) == 0:
+        return None
+    days, best = index.rolling_best(PREDICTION_WINDOW_DAYS, end=max(end, index.dates[-1]))
+    changed = (best[1:] != best[:-1]) & ~(np.isnan(best[1:]) & np.isnan(best[:-1]))
+    # Both sides of every change, so each level is drawn up to the next one
+    # (or to a gap with no runs) and the last one to the end of the axis
+    keep = np.ones(len(best), dtype=bool)
+    keep[1:-1] = changed[:-1] | changed[1:]
+    return pd.DataFrame({"date": pd.to_datetime(days[keep]), "pace_min": (1000 / best[keep]) / 60})
+
 def server(input, output, session):
     
+    @reactive.Calc
+    def athlete():
+        # ?athlete=<name> picks one of ATHLETES, the first one otherwise
+        query = parse_qs(session.clientdata.url_search().lstrip("?"))
+        name = query.get("athlete", [""])[0]
+        return name if name in DATASETS else next(iter(DATASETS))
+
+    @reactive.Calc
+    def dashboard_data():
+        return DATASETS[athlete()]()
+
+    def shared(name, *params):
+        """Key into SHARED_RESULTS for this session's athlete and data version."""
+        return (name, athlete(), str(dashboard_data()["source"])) + params
+
+    @reactive.Calc
+    def rollup_cube():
+        data = dashboard_data()
+        return SHARED_RESULTS.get(
+            shared("rollup"),
+            lambda: RollupCube(data["rollup_start"], data["sports"], data["by_sport"]),
+        )
+
+    @reactive.Effect
+    def _sport_choices():
+        sports = rollup_cube().sports
+        with reactive.isolate():
+            selected = input.sport()
+        ui.update_select(
+            "sport",
+            choices=[ALL_SPORTS] + sports,
+            selected=selected if selected in sports else ALL_SPORTS,
+        )
+
+    @reactive.Calc
+    def daily_load():
+        data = dashboard_data()
+        sport = input.sport()
+        if sport == ALL_SPORTS:
+            return SHARED_RESULTS.get(
+                shared("daily_load"),
+                lambda: pd.DataFrame({"date": pd.to_datetime(data["date"]), "load": data["load"]}),
+            )
+        # One sport's column of the cube, no regrouping of activities
+        cube = rollup_cube()
+        def sport_load():
+            days, load = cube.series("load", sport)
+            return pd.DataFrame({"date": pd.to_datetime(days), "load": load})
+        return SHARED_RESULTS.get(shared("daily_load", sport), sport_load)
+
     @reactive.Calc
     def calculate_trends():
-        df = df_load.copy()
+        data = dashboard_data()
+        df_load = daily_load()
+        ctl_days = input.ctl_days()
+        atl_days = input.atl_days()
+        sport = input.sport()
+        
+        # Default time constants over all sports: the snapshot already holds CTL/ATL
+        if sport == ALL_SPORTS and ctl_days == data["ctl_days"] and atl_days == data["atl_days"]:
+            return SHARED_RESULTS.get(
+                shared("trends", ctl_days, atl_days),
+                lambda: pmc.trends_frame(df_load, data["ctl"], data["atl"]),
+            )
         
         # Banister Model: 
         # CTL_now = CTL_prev * e^(-1/CTL_tc) + Load * (1 - e^(-1/CTL_tc))
-        
-        ctl_tc = 42  # Fitness (CTL) Days
-        atl_tc = 7   # Fatigue (ATL) Days
-        
-        ctl = [0.0]
-        atl = [0.0]
-        
-        alpha_ctl = np.exp(-1.0 / ctl_tc)
-        alpha_atl = np.exp(-1.0 / atl_tc)
-        
-        loads = df["load"].values
-        
-        for i in range(len(loads)):
-            ctl.append(ctl[i] * alpha_ctl + loads[i] * (1 - alpha_ctl))
-            atl.append(atl[i] * alpha_atl + loads[i] * (1 - alpha_atl))
-            
-        df["ctl"] = ctl[1:]
-        df["atl"] = atl[1:]
-        df["tsb"] = df["ctl"] - df["atl"]
-        
-        # 7-day Ramp Rate: CTL(t) - CTL(t-7)
-        df["ramp"] = df["ctl"].diff(7).fillna(0)
-        
-        return df
+        state_path = pmc_state_path(athlete(), sport, ctl_days, atl_days)
+        return SHARED_RESULTS.get(
+            shared("trends", ctl_days, atl_days) + (() if sport == ALL_SPORTS else (sport,)),
+            lambda: pmc.calculate_trends(
+                df_load,
+                ctl_days=ctl_days,
+                atl_days=atl_days,
+                state_path=state_path,
+            ),
+        )
+
+    @reactive.Calc
+    def pace_history():
+        data = dashboard_data()
+        return SHARED_RESULTS.get(shared("pace_history"), lambda: pace_frame(data))
+
+    @reactive.Calc
+    def best_efforts():
+        data = dashboard_data()
+        return SHARED_RESULTS.get(
+            shared("best_efforts"),
+            lambda: BestEffortIndex(data["pace_date"], data["pace_speed"]),
+        )
+
+    @reactive.Calc
+    def rolling_best():
+        index = best_efforts()
+        end = dashboard_data()["date"][-1]
+        return SHARED_RESULTS.get(shared("rolling_best"), lambda: rolling_best_frame(index, end))
+
+    # Visible x-range of the plot, None when zoomed all the way out
+    x_range = reactive.Value(None)
+
+    # (x, y) last sent to the browser for each trace of this session's plot
+    sent = []
 
     @render_widget
     def plot():
-        df = calculate_trends()
-        
-        # Create subplots
-        fig = make_subplots(
-            rows=4, cols=1, 
-            shared_xaxes=True, 
-            vertical_spacing=0.08,
-            subplot_titles=("Daily Training Load", "Form (TSB) & PMC", "Ramp Rate (7d)", "Estimated Race Pace"),
-            row_heights=[0.2, 0.4, 0.2, 0.2]
-        )
-        
-        # --- Row 1: Daily Load ---
-        load_fig = px.line(df, x="date", y="load")
-        load_trace = load_fig.data[0]
-        load_trace.name = "Daily Load"
-        load_trace.line = dict(color="rgba(142, 142, 147, 0.6)", width=2)
-        fig.add_trace(load_trace, row=1, col=1)
-        
-        # --- Row 2: Form (TSB), Fitness (CTL), Fatigue (ATL) ---
-        # Fitness (CTL)
-        fig.add_trace(go.Scatter(
-            x=df["date"], y=df["ctl"], 
-            name="Fitness (CTL)", 
-            line=dict(color="rgba(0, 191, 255, 0.6)", width=2.5)
-        ), row=2, col=1)
-        
-        # Fatigue (ATL)
-        fig.add_trace(go.Scatter(
-            x=df["date"], y=df["atl"], 
-            name="Fatigue (ATL)", 
-            line=dict(color="rgba(186, 85, 211, 0.6)", width=1.5)
-        ), row=2, col=1)
-        
-        # Form (TSB)
-        fig.add_trace(go.Scatter(
-            x=df["date"], y=df["tsb"], 
-            name="Form (TSB)", 
-            line=dict(color="rgba(76, 187, 23, 0.6)", width=2.5)
-        ), row=2, col=1)
-
-        # Add Training Zones to Row 2
-        # Risk Zone: Below -30
-        fig.add_hrect(y0=-100, y1=-30, fillcolor="rgba(255, 45, 85, 0.1)", line_width=0, layer="below", annotation_text="Risk", annotation_position="top left", row=2, col=1)
-        # Optimal Zone: -30 to -10
-        fig.add_hrect(y0=-30, y1=-10, fillcolor="rgba(76, 217, 100, 0.1)", line_width=0, layer="below", annotation_text="Optimal", annotation_position="top left", row=2, col=1)
-        # Grey Zone: -10 to 5
-        fig.add_hrect(y0=-10, y1=5, fillcolor="rgba(142, 142, 147, 0.1)", line_width=0, layer="below", row=2, col=1)
-        # Fresh Zone: Above 5
-        fig.add_hrect(y0=5, y1=100, fillcolor="rgba(0, 174, 239, 0.1)", line_width=0, layer="below", annotation_text="Fresh", annotation_position="top left", row=2, col=1)
-
-        # --- Row 3: Ramp Rate ---
-        # Positive ramp (green) - ramping up
-        ramp_positive = df["ramp"].clip(lower=0)
-        fig.add_trace(go.Scatter(
-            x=df["date"], y=ramp_positive, 
-            name="Ramp Up", 
-            line=dict(color="rgba(76, 187, 23, 0.6)", width=2),
-            fill='tozeroy',
-            fillcolor="rgba(76, 187, 23, 0.1)"
-        ), row=3, col=1)
-        
-        # Negative ramp (blue) - ramping down
-        ramp_negative = df["ramp"].clip(upper=0)
-        fig.add_trace(go.Scatter(
-            x=df["date"], y=ramp_negative, 
-            name="Ramp Down", 
-            line=dict(color="rgba(100, 149, 237, 0.6)", width=2),
-            fill='tozeroy',
-            fillcolor="rgba(100, 149, 237, 0.1)"
-        ), row=3, col=1)
-        
-        # --- Row 4: Race Pace ---
-        pace_history = get_race_pace_history()
-        if pace_history:
-            df_pace = pd.DataFrame(pace_history)
-            # Convert m/s to min/km (float minutes) for plotting
-            df_pace["pace_min"] = (1000 / df_pace["speed_mps"]) / 60
+        with metrics.span("plot"):
+            # plotly is only imported once the first plot renders
+            import figure
             
-            fig.add_trace(go.Scatter(
-                x=df_pace["date"], y=df_pace["pace_min"],
-                name="Est. Race Pace",
-                mode='lines+markers',
-                line=dict(color="rgba(255, 149, 0, 0.8)", width=2),
-                marker=dict(size=4),
-                hovertemplate="%{y:.2f} min/km<extra></extra>"
-            ), row=4, col=1)
+            # Only the cached skeleton; _push_points fills in the data
+            widget = figure.new_widget()
+            sent[:] = [None] * len(widget.data)
+
+            # Zooming or panning any (shared) x-axis refetches that window at full resolution
+            for axis in figure.X_AXES:
+                widget.layout[axis].on_change(on_zoom, "range")
+                widget.layout[axis].on_change(on_autorange, "autorange")
             
-            fig.update_yaxes(autorange="reversed", row=4, col=1) 
-
-        fig.update_layout(
-            template="plotly_white",
-            height=900,
-            showlegend=True,
-            legend=dict(
-                orientation="h",
-                yanchor="bottom",
-                y=1.02,
-                xanchor="right",
-                x=1
-            ),
-            hovermode="x unified",
-            margin=dict(l=60, r=40, t=100, b=60),
-            hoverlabel=dict(
-                bgcolor="white",
-                font_size=12,
-                font_family="Inter"
-            ),
-            legend_traceorder="normal"
-        )
+            return widget
 
-        # Sync axes and add spikelines for "same line" effect across all subplots
-        fig.update_xaxes(
-            showspikes=True,
-            spikemode="across",
-            spikesnap="cursor",
-            spikethickness=1,
-            spikedash="solid",
-            spikecolor="#666"
-        )
-        
-        fig.update_yaxes(
-            showspikes=True,
-            spikemode="across",
-            spikesnap="cursor",
-            spikethickness=1,
-            spikedash="solid",
-            spikecolor="#666"
-        )
-        
-        # Update axis titles
-        fig.update_yaxes(title_text="Load", row=1, col=1)
-        fig.update_yaxes(title_text="Stress / Balance", row=2, col=1)
-        fig.update_yaxes(title_text="Ramp", row=3, col=1)
-        fig.update_yaxes(title_text="Pace (min/km)", row=4, col=1)
-        fig.update_xaxes(title_text="Date", row=4, col=1)
-        
-        # Grid lines
-        fig.update_xaxes(showgrid=True, gridcolor="rgba(235, 235, 235, 1)")
-        fig.update_yaxes(showgrid=True, gridcolor="rgba(235, 235, 235, 1)")
+    def on_zoom(axis, axis_range):
+        if axis_range is not None:
+            x_range.set((np.datetime64(pd.Timestamp(axis_range[0])), np.datetime64(pd.Timestamp(axis_range[1]))))
+
+    def on_autorange(axis, autorange):
+        # Double-click resets the view
+        if autorange:
+            x_range.set(None)
+
+    @reactive.Effect
+    def _push_points():
+        import figure
         
-        return fig
+        widget = plot.widget
+        window = x_range()
+        df, df_pace, df_best = calculate_trends(), pace_history(), rolling_best()
+        sport, resolution = input.sport(), input.resolution()
+        # Weekly and coarser totals come straight from the cube's rollups
+        load = None
+        if resolution != "day":
+            load = rollup_cube().series("load", None if sport == ALL_SPORTS else sport, resolution)
+        with metrics.span("plot_update"):
+            figure.set_load_resolution(widget, resolution)
+            points = [downsample(x, y, window) for x, y in figure.trace_series(df, df_pace, df_best, load)]
+            array_bytes = figure.patch_traces(widget, points, sent)
+            metrics.add(points=sum(len(x) for x, _ in points), array_bytes=array_bytes)
 
     @render.ui
     def latest_values():
@@ -264,9 +345,45 @@ def server(input, output, session):
             )
 
 
+    # Last "Fit to Pace History" result: None before any click, {} if nothing could be fitted
+    banister_fit = reactive.Value(None)
+
+    @reactive.Effect
+    @reactive.event(input.fit_model)
+    def _fit_model():
+        df_load, df_pace = daily_load(), pace_history()
+        fit = None
+        if df_pace is not None:
+            fit = SHARED_RESULTS.get(shared("banister_fit", input.sport()), lambda: pmc.fit_banister(df_load, df_pace))
+        banister_fit.set(fit or {})
+        if fit:
+            # The fitted time constants drive calculate_trends through the sliders
+            ui.update_slider("ctl_days", value=fit["ctl_days"])
+            ui.update_slider("atl_days", value=fit["atl_days"])
+
+    @render.ui
+    def fit_summary():
+        fit = banister_fit()
+        if fit is None:
+            return None
+        style = "font-size: 0.85em; color: #888; margin: 8px 0 0;"
+        if not fit:
+            return ui.p(f"Not enough runs to fit (at least {pmc.FIT_MIN_PERFORMANCES} needed).", style=style)
+        return ui.p(
+            f"Fitted to {fit['performances']} runs: {fit['ctl_days']} / {fit['atl_days']} days, "
+            f"R² {fit['r2']:.2f}, RMSE {fit['rmse']:.2f} m/s",
+            style=style,
+        )
+
     @render.ui
     def performance_metrics():
-        preds = calculate_predictions()
+        # Best qualifying run of the last PREDICTION_WINDOW_DAYS, counted back from today
+        index = best_efforts()
+        start, today = prediction_window()
+        preds = SHARED_RESULTS.get(
+            shared("predictions", today),
+            lambda: format_predictions(index.best_in_window(start, today)),
+        )
         return ui.div(
              {"class": "card p-3 mb-3"},
             ui.h5("Predicted Paces", style="font-weight: 700; margin-bottom: 15px; color: #333;"),
@@ -286,4 +403,58 @@ def server(input, output, session):
             )
         )
 
+    @render.ui
+    def perf_panel():
+        query = parse_qs(session.clientdata.url_search().lstrip("?"))
+        if query.get("debug", [""])[0] != "1":
+            return None
+        reactive.invalidate_later(2)
+
+        cache = SHARED_RESULTS.stats()
+        header = ui.p(
+            f"Shared results: {cache['entries']} entries, {cache['bytes'] / 1e6:.1f} MB, "
+            f"{cache['hits']} hits / {cache['misses']} misses, {cache['evictions']} evictions",
+            style="color: #666;",
+        )
+        if not metrics.ENABLED:
+            return ui.div({"class": "card p-3 mt-3"}, header, ui.p("Set COROEBUS_METRICS=1 to record timings."))
+
+        rows = [
+            ui.tags.tr(
+                ui.tags.td(name),
+                ui.tags.td(total["calls"]),
+                ui.tags.td(f"{total['mean_ms']:.1f}"),
+                ui.tags.td(f"{total['max_ms']:.1f}"),
+                ui.tags.td(f"{total['last_ms']:.1f}"),
+                ui.tags.td(", ".join(f"{k}={v:,}" for k, v in total["counters"].items())),
+            )
+            for name, total in sorted(metrics.summary().items())
+        ]
+        return ui.div(
+            {"class": "card p-3 mt-3"},
+            ui.h5("Performance", style="font-weight: 700; color: #333;"),
+            header,
+            ui.tags.table(
+                {"class": "table table-sm"},
+                ui.tags.thead(ui.tags.tr(*[ui.tags.th(h) for h in ["Span", "Calls", "Mean ms", "Max ms", "Last ms", "Counters"]])),
+                ui.tags.tbody(*rows),
+            ),
+        )
+
+def metrics_endpoint(request):
+    """GET /metrics: span totals, recent spans and shared cache stats as JSON."""
+    from starlette.responses import JSONResponse
+    return JSONResponse({
+        "enabled": metrics.ENABLED,
+        "spans": metrics.summary(),
+        "recent": metrics.recent(50),
+        "shared_results": SHARED_RESULTS.stats(),
+    })
+
 app = App(app_ui, server)
+
+if not IN_BROWSER:
+    from starlette.routing import Route
+
+    # Ahead of Shiny's own routes, so "/" doesn't swallow it
+    app.starlette_app.router.routes.insert(0, Route("/metrics", metrics_endpoint))
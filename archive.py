@@ -0,0 +1,159 @@
+"""
+Activity archives as a directory of JSON files or as a single .zip file.
+
+A zipped archive holds the same files as the directory, flat, one deflated
+member each. The zip's central directory is the index: listing it costs one
+read, and any member can be read on its own without extracting the rest.
+Paths into a zip look like directory paths (activities.zip/123.json), so code
+that joins names onto ACTIVITIES_DIR works with either form.
+
+Pack a directory with:
+    python archive.py activities/activities activities.zip
+"""
+import argparse
+import os
+import struct
+import threading
+import zipfile
+import zlib
+from pathlib import Path
+
+# Open zipped archives, keyed by path, with the (mtime_ns, size) they were opened at
+_zips = {}
+_lock = threading.Lock()
+
+
+def is_zip(path):
+    """True if path is a zipped activity archive rather than a directory."""
+    path = Path(path)
+    return path.suffix == ".zip" and path.is_file()
+
+
+def _open_zip(path):
+    """
+    Open a zipped archive and its {name: ZipInfo} index, reusing them until the file changes.
+    """
+    path = Path(path).resolve()
+    st = path.stat()
+    stamp = (st.st_mtime_ns, st.st_size)
+    with _lock:
+        opened = _zips.get(path)
+        if opened is None or opened[0] != stamp:
+            # A replaced zip's old handle closes once readers still using it let go
+            zf = zipfile.ZipFile(path)
+            index = {Path(info.filename).name: info for info in zf.infolist() if not info.is_dir()}
+            opened = _zips[path] = (stamp, zf, index)
+        return opened[1], opened[2]
+
+
+def _read_member(zf, info):
+    """
+    Bytes of one member, read with two positioned reads straight from its
+    local header. Much lighter than zf.read for small files; anything other
+    than a plain stored or deflated member goes through zf.read.
+    """
+    plain = info.compress_type in (zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED) and not info.flag_bits & 1
+    if not plain or not hasattr(os, "pread"):
+        return zf.read(info)
+    fd = zf.fp.fileno()
+    header = os.pread(fd, 30, info.header_offset)
+    name_len, extra_len = struct.unpack("<HH", header[26:30])
+    data = os.pread(fd, info.compress_size, info.header_offset + 30 + name_len + extra_len)
+    if info.compress_type == zipfile.ZIP_DEFLATED:
+        data = zlib.decompress(data, -15)
+    if zlib.crc32(data) != info.CRC:
+        raise zipfile.BadZipFile(f"Bad CRC-32 for {info.filename}")
+    return data
+
+
+def scan(activities_dir, select):
+    """
+    Stat info of the archive files whose name passes select(name).
+
+    Returns:
+        dict: {filename: (stamp, size)}. The stamp is the file's mtime_ns in a
+        directory and the member's CRC-32 in a zip; either changes when the
+        file's contents do.
+    """
+    if is_zip(activities_dir):
+        _, index = _open_zip(activities_dir)
+        return {name: (info.CRC, info.file_size) for name, info in index.items() if select(name)}
+
+    stats = {}
+    with os.scandir(activities_dir) as entries:
+        for entry in entries:
+            if select(entry.name):
+                st = entry.stat()
+                stats[entry.name] = (st.st_mtime_ns, st.st_size)
+    return stats
+
+
+def reader(activities_dir):
+    """
+    Returns:
+        function: name -> contents of that archive file, for reading many
+        files of one archive without resolving it again for each.
+    """
+    if is_zip(activities_dir):
+        zf, index = _open_zip(activities_dir)
+
+        def read_member(name):
+            info = index.get(name)
+            if info is None:
+                raise FileNotFoundError(f"{name} is not in {activities_dir}")
+            return _read_member(zf, info).decode("utf-8")
+        return read_member
+
+    def read_file(name):
+        with open(os.path.join(activities_dir, name), "r", encoding="utf-8") as f:
+            return f.read()
+    return read_file
+
+
+def read_text(filepath):
+    """Contents of an archive file, given its path in a directory or a zip."""
+    filepath = Path(filepath)
+    if is_zip(filepath.parent):
+        zf, index = _open_zip(filepath.parent)
+        info = index.get(filepath.name)
+        if info is None:
+            raise FileNotFoundError(f"{filepath.name} is not in {filepath.parent}")
+        return _read_member(zf, info).decode("utf-8")
+
+    with open(filepath, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def pack(activities_dir, zip_path, compresslevel=6):
+    """
+    Write every JSON file of an activities directory into a new zipped archive.
+
+    Returns:
+        int: number of files packed.
+    """
+    zip_path = Path(zip_path)
+    names = sorted(name for name in os.listdir(activities_dir) if name.endswith(".json"))
+    tmp_path = zip_path.with_suffix(".tmp")
+    with zipfile.ZipFile(tmp_path, "w", zipfile.ZIP_DEFLATED, compresslevel=compresslevel) as zf:
+        for name in names:
+            zf.write(Path(activities_dir) / name, arcname=name)
+    os.replace(tmp_path, zip_path)
+    return len(names)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pack an activities directory into a .zip archive")
+    parser.add_argument("activities_dir", type=Path)
+    parser.add_argument("zip_path", type=Path)
+    parser.add_argument("--level", type=int, default=6, help="deflate level (1-9)")
+    args = parser.parse_args()
+
+    if args.zip_path.suffix != ".zip":
+        parser.error("the archive must be a .zip file")
+    n = pack(args.activities_dir, args.zip_path, args.level)
+    before = sum(f.stat().st_size for f in args.activities_dir.glob("*.json"))
+    print(f"Packed {n} files ({before / 1e6:.1f} MB) into {args.zip_path} ({args.zip_path.stat().st_size / 1e6:.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
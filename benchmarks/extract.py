@@ -0,0 +1,107 @@
+"""
+Parse time and peak memory per activity file: full json.load against the
+partial extraction of the catalog's keys (partial_json.extract_top_level).
+
+Files are grouped by size, since detailed activities (segment efforts, laps,
+splits, polylines) are where skipping the nested arrays pays off. Timings are
+the best of --repeat decodes of text already in memory; peaks are measured
+with tracemalloc. The last line is catalog.decode_activity, which picks one
+of the two by PARTIAL_PARSE_MIN_BYTES.
+
+Without ACTIVITIES_DIR a synthetic archive of detailed activities is
+generated (once) under CACHE_DIR/synthetic.
+
+Usage:
+    python -m benchmarks.extract [ACTIVITIES_DIR] [--limit 1000] [--repeat 5]
+"""
+import argparse
+import json
+import statistics
+import time
+import tracemalloc
+from pathlib import Path
+
+import catalog
+from benchmarks.synthetic import generate_archive
+from partial_json import extract_top_level
+
+# Upper bounds (bytes) of the size groups
+SIZE_GROUPS = [4096, 8192, 16384, 32768, 65536, float("inf")]
+
+
+def detailed_archive(n_activities=1000, seed=0):
+    out_dir = catalog.CACHE_DIR / "synthetic" / f"{n_activities}-seed{seed}-detailed"
+    done = out_dir / ".complete"
+    if not done.exists():
+        print(f"Generating {n_activities} detailed activities in {out_dir}...")
+        generate_archive(out_dir, n_activities, seed, streams_fraction=0.0, detailed_fraction=1.0)
+        done.touch()
+    return out_dir
+
+
+def measure(fn, text, repeat):
+    """Best seconds of fn(text) over repeat runs, and the peak bytes allocated by one run."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(text)
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    fn(text)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("activities_dir", nargs="?", type=Path)
+    parser.add_argument("--limit", type=int, default=1000, help="files measured at most")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    activities_dir = args.activities_dir or detailed_archive()
+    names = sorted(catalog.scan_activity_files(activities_dir))[:args.limit]
+    full = lambda text: json.loads(text)
+    partial = lambda text: extract_top_level(text, catalog.RECORD_KEYS)
+
+    rows = []
+    for name in names:
+        text = (Path(activities_dir) / name).read_text(encoding="utf-8")
+        try:
+            expected = full(text)
+            if not isinstance(expected, dict):
+                continue
+            got = partial(text)
+        except ValueError:
+            continue
+        if got != {key: expected[key] for key in catalog.RECORD_KEYS if key in expected}:
+            print(f"{name}: partial extraction differs from json.loads!")
+        rows.append((len(text), *measure(full, text, args.repeat), *measure(partial, text, args.repeat),
+                     measure(catalog.decode_activity, text, args.repeat)[0]))
+
+    print(f"{len(rows)} activity files in {activities_dir}\n")
+    print(f"{'size':>13} {'files':>6} {'json.load':>10} {'partial':>10} {'speedup':>8} {'peak full':>10} {'peak partial':>13}")
+    lower = 0
+    for upper in SIZE_GROUPS:
+        group = [row for row in rows if lower <= row[0] < upper]
+        label = f"<{upper // 1024:.0f} KB" if upper != float("inf") else f">={lower // 1024} KB"
+        lower = upper
+        if not group:
+            continue
+        full_s = statistics.median(row[1] for row in group)
+        partial_s = statistics.median(row[3] for row in group)
+        print(
+            f"{label:>13} {len(group):>6} {full_s * 1e6:>8.0f}us {partial_s * 1e6:>8.0f}us {full_s / partial_s:>7.2f}x"
+            f" {statistics.median(row[2] for row in group) / 1024:>7.1f} KB"
+            f" {statistics.median(row[4] for row in group) / 1024:>10.1f} KB"
+        )
+
+    total_full = sum(row[1] for row in rows)
+    total_chosen = sum(row[5] for row in rows)
+    print(f"\nAll files: json.load {total_full:.3f}s, decode_activity {total_chosen:.3f}s"
+          f" (x{total_full / total_chosen:.2f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Wall-clock comparison of serial and process-pool catalog ingest.
+
+Every run starts from a cold cache (empty temporary CACHE_DIR and no
+in-process catalog), so it measures a full rebuild of the archive.
+
+Usage:
+    python -m benchmarks.ingest [ACTIVITIES_DIR] [--workers 2 4 8] [--repeat 3]
+"""
+import argparse
+import os
+import tempfile
+import time
+from pathlib import Path
+
+import catalog
+
+
+def time_cold_ingest(activities_dir, workers):
+    with tempfile.TemporaryDirectory() as cache_dir:
+        original_cache_dir = catalog.CACHE_DIR
+        catalog.CACHE_DIR = Path(cache_dir)
+        catalog._catalogs.clear()
+        try:
+            start = time.perf_counter()
+            frame = catalog.load_catalog(activities_dir, workers=workers)
+            elapsed = time.perf_counter() - start
+        finally:
+            catalog.CACHE_DIR = original_cache_dir
+            catalog._catalogs.clear()
+    return elapsed, frame
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("activities_dir", nargs="?", default=catalog.ACTIVITIES_DIR, type=Path)
+    parser.add_argument("--workers", nargs="+", type=int, default=[2, 4, os.cpu_count() or 1])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    n_files = len(catalog.scan_activity_files(args.activities_dir))
+    print(f"{n_files} activity files in {args.activities_dir}")
+
+    baseline = None
+    serial_best = None
+    for workers in [1] + sorted(set(args.workers) - {1}):
+        best = min(time_cold_ingest(args.activities_dir, workers)[0] for _ in range(args.repeat))
+        _, frame = time_cold_ingest(args.activities_dir, workers)
+        frame = frame.sort_values("file", ignore_index=True)
+        if baseline is None:
+            baseline = frame
+            serial_best = best
+        elif not frame.equals(baseline):
+            print(f"workers={workers}: catalog differs from the serial result!")
+
+        print(f"workers={workers:>3}  best of {args.repeat}: {best:.3f}s  speedup x{serial_best / best:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+"""
+Concurrent-session load test of app.py.
+
+Starts the app on a synthetic archive with a fresh startup snapshot, fully
+offline, and for each --sessions level opens that many websocket sessions
+at once (or spread over --ramp seconds) and waits for every output to
+render. Each level gets a freshly started app; a warm-up session renders
+first so one-time imports aren't charged to the level.
+
+Reported per level:
+    p50/p95/p99/max time-to-render of each output, from session start
+        ("plot" is the first trace data, not the empty widget)
+    server CPU seconds and RSS growth, in total and per session
+    client CPU seconds (the harness shares the machine with the server)
+    sessions that failed or timed out
+
+Sessions stay connected until the whole level has rendered, as open
+browser tabs would, so the RSS growth counts what each open session holds.
+By default every session shows the default sliders and shares the cached
+results; --vary gives each session its own CTL/ATL pair, so each one
+computes its own trends. Server CPU and memory are read from /proc (Linux
+only); elsewhere they're left out.
+
+Results go to benchmarks/results/loadtest-<commit>.json (or --output) so
+runs can be compared for regressions.
+
+Usage:
+    python -m benchmarks.loadtest [--size 10000] [--sessions 1 10 25 50] [--vary] [--ramp 0]
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+
+from benchmarks.shiny_client import OUTPUTS, free_port, render_session, start_app, stop_app, wait_until_ready
+from benchmarks.startup import prepare_cache
+from benchmarks.suite import RESULTS_DIR, current_commit, synthetic_archive
+
+PERCENTILES = [50, 95, 99]
+
+
+def process_stats(pid):
+    """
+    Returns:
+        tuple: (CPU seconds, resident bytes) of a process, or None where
+        /proc isn't available.
+    """
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            # Fields after the command name, which may contain spaces
+            fields = f.read().rsplit(")", 1)[1].split()
+        with open(f"/proc/{pid}/statm") as f:
+            resident_pages = int(f.read().split()[1])
+    except OSError:
+        return None
+    ticks = os.sysconf("SC_CLK_TCK")
+    cpu = (int(fields[11]) + int(fields[12])) / ticks
+    return cpu, resident_pages * os.sysconf("SC_PAGE_SIZE")
+
+
+def session_inputs(i, vary):
+    """Slider values of session i: the defaults, or a distinct CTL/ATL pair per session."""
+    if not vary:
+        return {}
+    return {"ctl_days": 20 + i % 60, "atl_days": 3 + (i // 60) % 15}
+
+
+async def run_level(port, pid, n_sessions, vary, ramp, timeout):
+    """
+    Open n_sessions sessions, measure them, close them.
+
+    Returns:
+        dict: "timings" (one dict per rendered session), "failed", "wall",
+        "server" (CPU seconds and RSS growth, None without /proc) and
+        "client_cpu".
+    """
+    finished = 0
+    all_finished = asyncio.Event()
+    release = asyncio.Event()
+
+    def count():
+        nonlocal finished
+        finished += 1
+        if finished == n_sessions:
+            all_finished.set()
+
+    async def hold():
+        count()
+        await release.wait()
+
+    async def session(i):
+        await asyncio.sleep(ramp * i / n_sessions)
+        try:
+            return await render_session(port, session_inputs(i, vary), timeout=timeout, hold=hold)
+        except (asyncio.TimeoutError, RuntimeError, OSError) as e:
+            count()
+            return e
+
+    before = process_stats(pid)
+    client_before = time.process_time()
+    started = time.perf_counter()
+    tasks = asyncio.gather(*(session(i) for i in range(n_sessions)))
+    await all_finished.wait()
+    wall = time.perf_counter() - started
+    after = process_stats(pid)
+    client_cpu = time.process_time() - client_before
+    release.set()
+    results = await tasks
+
+    server = None
+    if before is not None and after is not None:
+        server = {"cpu": after[0] - before[0], "rss_growth": after[1] - before[1], "rss": after[1]}
+    return {
+        "timings": [r for r in results if isinstance(r, dict)],
+        "failed": [repr(r) for r in results if not isinstance(r, dict)],
+        "wall": wall,
+        "server": server,
+        "client_cpu": client_cpu,
+    }
+
+
+async def measure_level(activities_dir, cache_dir, n_sessions, vary, ramp, timeout):
+    port = free_port()
+    env = {"COROEBUS_CACHE_DIR": str(cache_dir), "COROEBUS_ACTIVITIES_DIR": str(activities_dir)}
+    process, _ = start_app(port, env)
+    try:
+        await wait_until_ready(port)
+        await render_session(port, timeout=timeout)
+        return await run_level(port, process.pid, n_sessions, vary, ramp, timeout)
+    finally:
+        stop_app(process)
+
+
+def summarize(level, n_sessions):
+    """Percentiles per output and per-session resource use of one run_level result."""
+    summary = {"sessions": n_sessions, "rendered": len(level["timings"]), "failed": len(level["failed"])}
+    for name in OUTPUTS:
+        values = [timings[name] for timings in level["timings"]]
+        if values:
+            summary[name] = dict(zip([f"p{p}" for p in PERCENTILES], np.percentile(values, PERCENTILES).tolist()))
+            summary[name]["max"] = max(values)
+    summary["wall"] = level["wall"]
+    summary["client_cpu"] = level["client_cpu"]
+    summary["bytes_per_session"] = float(np.mean([t["bytes"] for t in level["timings"]])) if level["timings"] else 0.0
+    if level["server"] is not None:
+        summary["server_cpu"] = level["server"]["cpu"]
+        summary["server_rss"] = level["server"]["rss"]
+        summary["rss_growth"] = level["server"]["rss_growth"]
+    return summary
+
+
+def print_summary(summary):
+    n = summary["sessions"]
+    print(f"\n{n} sessions: {summary['rendered']} rendered, {summary['failed']} failed, {summary['wall']:.2f}s wall")
+    print(f"  {'output':<20} " + " ".join(f"{f'p{p}':>8}" for p in PERCENTILES) + f" {'max':>8}")
+    for name in OUTPUTS:
+        if name in summary:
+            row = summary[name]
+            print(f"  {name:<20} " + " ".join(f"{row[f'p{p}']:>7.3f}s" for p in PERCENTILES) + f" {row['max']:>7.3f}s")
+    if "server_cpu" in summary:
+        print(
+            f"  server CPU {summary['server_cpu']:.2f}s ({summary['server_cpu'] / n * 1000:.0f} ms/session), "
+            f"RSS {summary['server_rss'] / 1e6:.0f} MB (+{summary['rss_growth'] / 1e6:.1f} MB, "
+            f"{summary['rss_growth'] / n / 1e6:.2f} MB/session)"
+        )
+    print(f"  client CPU {summary['client_cpu']:.2f}s, {summary['bytes_per_session'] / 1e3:.0f} KB received per session")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--size", type=int, default=10000, help="activities in the synthetic archive")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--sessions", nargs="+", type=int, default=[1, 10, 25, 50])
+    parser.add_argument("--vary", action="store_true", help="a distinct CTL/ATL pair per session")
+    parser.add_argument("--ramp", type=float, default=0.0, help="seconds over which each level's sessions start")
+    parser.add_argument("--timeout", type=float, default=120.0, help="seconds a session may take to render")
+    parser.add_argument("--output", type=Path, help="results file (default: benchmarks/results/loadtest-<commit>.json)")
+    args = parser.parse_args()
+
+    activities_dir = synthetic_archive(args.size, args.seed).resolve()
+    commit = current_commit()
+    report = {
+        "commit": commit,
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "size": args.size,
+        "seed": args.seed,
+        "vary": args.vary,
+        "ramp": args.ramp,
+        "levels": [],
+    }
+    print(f"{args.size} activities, {'distinct' if args.vary else 'shared'} sliders, {os.cpu_count()} CPUs")
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_dir = Path(tmp) / "cache"
+        prepare_cache(cache_dir, activities_dir, "snapshot")
+        for n_sessions in args.sessions:
+            level = asyncio.run(measure_level(activities_dir, cache_dir, n_sessions, args.vary, args.ramp, args.timeout))
+            summary = summarize(level, n_sessions)
+            print_summary(summary)
+            for failure in level["failed"][:3]:
+                print(f"  failed: {failure}")
+            report["levels"].append(summary)
+
+    output = args.output or RESULTS_DIR / f"loadtest-{commit}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nSaved {output}")
+
+
+if __name__ == "__main__":
+    main()
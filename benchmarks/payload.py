@@ -0,0 +1,199 @@
+"""
+Size and client-side decode time of the plot's trace updates: the compact
+encoding of figure.encode_trace (binary y, x0/dx or date-only strings for x)
+against plain arrays (an ISO date-time string per point).
+
+Messages are built the way the plot output sends them: the widget's batched
+update, its binary buffers base64-encoded and packed by shinywidgets into a
+Shiny custom message. Sizes are reported raw and deflated (as with websocket
+compression). Decode times are the median of --repeat runs in node, if it's
+on the PATH: both JSON.parse calls, base64 to typed arrays and every x to
+milliseconds (Date.parse of each string, or x0 + i * dx), which is what the
+browser does before plotly.js draws anything. Without node only json.loads
+is timed.
+
+Views are the full history (downsampled to TARGET_POINTS per trace), a
+zoomed window short enough to send every day, and weekly load totals.
+
+Usage:
+    python -m benchmarks.payload [--sizes 1000 10000 100000] [--repeat 20]
+"""
+import argparse
+import json
+import shutil
+import statistics
+import subprocess
+import tempfile
+import time
+import zlib
+from base64 import b64encode
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from ipywidgets.widgets.widget import _remove_buffers
+
+import figure
+import pmc
+from benchmarks.suite import synthetic_archive
+from downsample import TARGET_POINTS, downsample
+from load_data import get_daily_load, get_rollup
+from performance import get_race_pace_history
+
+# Decodes each message like the browser does; prints the median ms per message
+NODE_SCRIPT = r"""
+const messages = JSON.parse(require("fs").readFileSync(process.argv[2], "utf8"));
+const repeat = Number(process.argv[3]);
+function decode(text) {
+  const outer = JSON.parse(text);
+  const msg = JSON.parse(outer.custom.shinywidgets_comm_msg);
+  const data = msg.content.data.state._py2js_update.style_data;
+  // Buffer paths look like ["_py2js_update", "style_data", "y", trace, "buffer"]
+  msg.content.data.buffer_paths.forEach((path, i) => {
+    const bytes = Buffer.from(msg.buffers[i], "base64");
+    data.y[path[3]] = new Float64Array(bytes.buffer.slice(bytes.byteOffset, bytes.byteOffset + bytes.length));
+  });
+  let points = 0;
+  data.y.forEach((y, i) => {
+    const n = y.length;
+    const x = data.x ? data.x[i] : null;
+    const xs = new Float64Array(n);
+    if (Array.isArray(x)) {
+      for (let j = 0; j < n; j++) xs[j] = Date.parse(x[j]);
+    } else {
+      const x0 = Date.parse(data.x0[i]), dx = data.dx[i];
+      for (let j = 0; j < n; j++) xs[j] = x0 + j * dx;
+    }
+    points += n;
+  });
+  return points;
+}
+const result = {};
+for (const [name, text] of Object.entries(messages)) {
+  const times = [];
+  for (let r = 0; r < repeat; r++) {
+    const start = process.hrtime.bigint();
+    decode(text);
+    times.push(Number(process.hrtime.bigint() - start) / 1e6);
+  }
+  times.sort((a, b) => a - b);
+  result[name] = times[Math.floor(times.length / 2)];
+}
+console.log(JSON.stringify(result));
+"""
+
+
+def json_packer(msg):
+    """
+    shinywidgets' message packer (importing shinywidgets would refuse widgets
+    built outside a Shiny session): date-times go out as ISO strings in UTC.
+    """
+    def default(obj):
+        if isinstance(obj, datetime):
+            return obj.replace(tzinfo=obj.tzinfo or timezone.utc).isoformat().replace("+00:00", "Z")
+        raise TypeError(f"{type(obj).__name__} is not JSON serializable")
+    return json.dumps(msg, default=default, ensure_ascii=False, allow_nan=False)
+
+
+def update_message(points, compact):
+    """
+    The Shiny message that sends points to a fresh plot widget.
+
+    Args:
+        compact: encode with figure.patch_traces, otherwise set x and y as is.
+    """
+    widget = figure.new_widget()
+    states = []
+    widget.send_state = lambda key=None: states.append(widget.get_state(key))
+    if compact:
+        figure.patch_traces(widget, points, [None] * len(widget.data))
+    else:
+        with widget.batch_update():
+            for trace, (x, y) in zip(widget.data, points):
+                # The app's frames hold datetime64[s], which reach the packer as date-times
+                trace.x = np.asarray(x).astype("datetime64[s]")
+                trace.y = y
+
+    # The update is followed by a message resetting it
+    update = next(state for state in states if state.get("_py2js_update"))
+    state, buffer_paths, buffers = _remove_buffers(update)
+    msg = {
+        "content": {"data": {"method": "update", "state": state, "buffer_paths": buffer_paths}, "comm_id": "0" * 32},
+        "metadata": {},
+        "buffers": [b64encode(buffer).decode("ascii") for buffer in buffers],
+    }
+    return json.dumps({"custom": {"shinywidgets_comm_msg": json_packer(msg)}})
+
+
+def dashboard_views(activities_dir):
+    """{view: full-resolution (x, y) per trace, downsampling window}, as the app sends them."""
+    df = pmc.calculate_trends(get_daily_load(activities_dir=activities_dir))
+    history = get_race_pace_history(activities_dir)
+    df_pace = None
+    if history:
+        df_pace = pd.DataFrame(history)
+        df_pace["date"] = pd.to_datetime(df_pace["date"])
+        df_pace["pace_min"] = (1000 / df_pace["speed_mps"]) / 60
+
+    end = np.datetime64(df["date"].iloc[-1])
+    zoom = (end - np.timedelta64(TARGET_POINTS // 2, "D"), end)
+    weekly = get_rollup(activities_dir=activities_dir).series("load", resolution="week")
+    return {
+        "full history": (figure.trace_series(df, df_pace), None),
+        f"last {TARGET_POINTS // 2} days": (figure.trace_series(df, df_pace), zoom),
+        "weekly load": (figure.trace_series(df, df_pace, load=weekly), None),
+    }
+
+
+def node_decode_ms(messages, repeat):
+    """Median decode ms of each message in node, None without node."""
+    node = shutil.which("node")
+    if node is None:
+        return None
+    with tempfile.TemporaryDirectory() as tmp:
+        script, data = Path(tmp) / "decode.js", Path(tmp) / "messages.json"
+        script.write_text(NODE_SCRIPT)
+        data.write_text(json.dumps(messages))
+        out = subprocess.run([node, str(script), str(data), str(repeat)], capture_output=True, text=True, check=True)
+    return json.loads(out.stdout)
+
+
+def python_decode_ms(text, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        json.loads(json.loads(text)["custom"]["shinywidgets_comm_msg"])
+        times.append(time.perf_counter() - start)
+    return statistics.median(times) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        messages = {}
+        for view, (series, window) in dashboard_views(synthetic_archive(size)).items():
+            points = [downsample(x, y, window) for x, y in series]
+            for encoding, compact in (("json", False), ("compact", True)):
+                messages[(view, encoding)] = (update_message(points, compact), sum(len(x) for x, _ in points))
+
+        decoded = node_decode_ms({f"{view}|{encoding}": text for (view, encoding), (text, _) in messages.items()}, args.repeat)
+        where = "node" if decoded is not None else "python json.loads"
+        print(f"\n=== {size} activities (decode times: {where}) ===")
+        print(f"{'view':<18} {'encoding':<8} {'points':>7} {'bytes':>10} {'deflated':>10} {'decode':>9} {'size':>7}")
+        for view in dict.fromkeys(view for view, _ in messages):
+            baseline = len(messages[(view, "json")][0])
+            for encoding in ("json", "compact"):
+                text, n_points = messages[(view, encoding)]
+                deflated = len(zlib.compress(text.encode("utf-8"), 6))
+                ms = decoded[f"{view}|{encoding}"] if decoded is not None else python_decode_ms(text, args.repeat)
+                print(f"{view:<18} {encoding:<8} {n_points:>7} {len(text):>10,} {deflated:>10,} {ms:>7.2f}ms"
+                      f" {baseline / len(text):>6.2f}x")
+
+
+if __name__ == "__main__":
+    main()
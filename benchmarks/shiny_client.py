@@ -0,0 +1,114 @@
+"""
+Minimal headless Shiny client used by the benchmarks.
+
+Speaks just enough of the Shiny websocket protocol to open a session with a
+set of inputs and time when each output (and the plot's first data update)
+reaches the browser side.
+"""
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import websockets
+
+APP_DIR = Path(__file__).resolve().parent.parent
+
+# Inputs a browser would send for the dashboard's default state
+DEFAULT_INPUTS = {
+    "ctl_days": 42,
+    "atl_days": 7,
+    "sport": "All",
+    "resolution": "day",
+    "fit_model:shiny.action": 0,
+    ".clientdata_url_search": "",
+}
+OUTPUTS = ["plot", "latest_values", "performance_metrics"]
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_app(port, env=None):
+    """Run app.py under `shiny run` on port; returns (process, start time)."""
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "shiny", "run", "app.py", "--port", str(port)],
+        cwd=APP_DIR,
+        env={**os.environ, **(env or {})},
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    return process, started
+
+
+def stop_app(process):
+    process.terminate()
+    try:
+        process.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+async def wait_until_ready(port, timeout=120):
+    """Seconds until the server accepts a websocket, polling every 20 ms."""
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        try:
+            async with websockets.connect(f"ws://127.0.0.1:{port}/websocket/"):
+                return
+        except OSError:
+            await asyncio.sleep(0.02)
+    raise TimeoutError(f"app on port {port} didn't start within {timeout}s")
+
+
+async def render_session(port, inputs=None, outputs=OUTPUTS, timeout=120, hold=None):
+    """
+    Open one session and wait for every output to render.
+
+    Args:
+        hold: optional coroutine function, awaited once everything has
+            rendered while the session is still connected (like an open tab).
+
+    Returns:
+        dict: seconds from session start to each output's first value; the
+        "plot" entry waits for the first trace data update, not just the
+        empty widget. Also "bytes" received in total.
+    """
+    init = {**DEFAULT_INPUTS, **(inputs or {})}
+    for name in outputs:
+        init[f".clientdata_output_{name}_hidden"] = False
+
+    timings = {}
+    received = 0
+    started = time.perf_counter()
+    async with websockets.connect(f"ws://127.0.0.1:{port}/websocket/", max_size=None) as ws:
+        await ws.send(json.dumps({"method": "init", "data": init}))
+        while len(timings) < len(outputs):
+            raw = await asyncio.wait_for(ws.recv(), timeout)
+            received += len(raw)
+            message = json.loads(raw)
+            now = time.perf_counter() - started
+
+            for name in message.get("values", {}):
+                if name in outputs and name != "plot":
+                    timings.setdefault(name, now)
+            if message.get("errors"):
+                raise RuntimeError(f"output errors: {message['errors']}")
+
+            custom = message.get("custom", {}).get("shinywidgets_comm_msg")
+            if custom and "_py2js_update" in custom and '"_py2js_update": null' not in custom:
+                timings.setdefault("plot", now)
+
+        if hold is not None:
+            await hold()
+
+    timings["bytes"] = received
+    return timings
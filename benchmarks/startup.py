@@ -0,0 +1,86 @@
+"""
+Time-to-first-render of app.py from process start.
+
+Modes:
+    cold      empty cache: the app ingests the whole archive before serving
+    snapshot  fresh startup snapshot: served straight from the .npz
+    stale     outdated snapshot: served immediately, rebuilt in the background
+
+Usage:
+    python -m benchmarks.startup [ACTIVITIES_DIR] [--repeat 3]
+"""
+import argparse
+import asyncio
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+import catalog
+from benchmarks.shiny_client import APP_DIR, free_port, render_session, start_app, stop_app, wait_until_ready
+
+
+def prepare_cache(cache_dir, activities_dir, mode):
+    shutil.rmtree(cache_dir, ignore_errors=True)
+    os.makedirs(cache_dir)
+    if mode == "cold":
+        return
+
+    env = {**os.environ, "COROEBUS_CACHE_DIR": str(cache_dir), "COROEBUS_ACTIVITIES_DIR": str(activities_dir)}
+    subprocess.run([sys.executable, "load_data.py"], cwd=APP_DIR, env=env, check=True, stdout=subprocess.DEVNULL)
+
+    if mode == "stale":
+        # Pretend the archive changed since the snapshot was written
+        path = next(Path(cache_dir).glob("snapshot-*.npz"))
+        with np.load(path) as stored:
+            arrays = {key: stored[key] for key in stored.files}
+        arrays["source"] = np.array("")
+        with open(path, "wb") as f:
+            np.savez(f, **arrays)
+
+
+async def measure(activities_dir, cache_dir):
+    port = free_port()
+    env = {"COROEBUS_CACHE_DIR": str(cache_dir), "COROEBUS_ACTIVITIES_DIR": str(activities_dir)}
+    process, started = start_app(port, env)
+    try:
+        await wait_until_ready(port)
+        ready = time.perf_counter() - started
+        timings = await render_session(port)
+        first_render = time.perf_counter() - started
+    finally:
+        stop_app(process)
+    return ready, first_render, timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("activities_dir", nargs="?", default=catalog.ACTIVITIES_DIR, type=Path)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--modes", nargs="+", default=["cold", "snapshot", "stale"])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_dir = Path(tmp) / "cache"
+        for mode in args.modes:
+            ready_times = []
+            render_times = []
+            for _ in range(args.repeat):
+                prepare_cache(cache_dir, args.activities_dir.resolve(), mode)
+                ready, first_render, _ = asyncio.run(measure(args.activities_dir.resolve(), cache_dir))
+                ready_times.append(ready)
+                render_times.append(first_render)
+            print(
+                f"{mode:>8}: server ready {statistics.median(ready_times):.2f}s, "
+                f"first render {statistics.median(render_times):.2f}s (median of {args.repeat})"
+            )
+
+
+if __name__ == "__main__":
+    main()
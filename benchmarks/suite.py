@@ -0,0 +1,221 @@
+"""
+Per-stage timings of the data pipeline on synthetic archives.
+
+For every archive size, each stage is timed separately (best of --repeat):
+
+    list            scan_activity_files: directory listing and stats
+    parse           parse_files: JSON decoding of every summary, serial
+    catalog_cold    load_catalog with an empty cache (parse + frame + persist)
+    catalog_warm    load_catalog from the persisted catalog in a fresh process state
+    stream_loads    get_stream_loads with an empty cache (NP / hrTSS)
+    best_splits     get_best_splits with an empty cache (1k/5k/10k/half)
+    daily_load      get_daily_load on a warm catalog
+    rollup_cold     get_rollup with no stored cube (day x sport cube + rollups)
+    rollup_warm     get_rollup from the stored cube, nothing changed
+    trends          pmc.calculate_trends at the default CTL/ATL
+    predictions     get_best_speed + format_predictions
+    pace_history    get_race_pace_history
+    banister_fit    pmc.fit_banister of the daily load to the pace history
+    figure_build    skeleton + full-resolution traces
+    figure_json     serializing that figure for the browser
+
+Archives are generated once per (size, seed) under CACHE_DIR/synthetic and
+reused. Results go to a JSON file tagged with the current commit; pass two
+result files to --compare to see per-stage ratios.
+
+Usage:
+    python -m benchmarks.suite [--sizes 1000 10000 100000] [--repeat 3] [--output FILE]
+    python -m benchmarks.suite --compare OLD.json NEW.json
+"""
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pandas as pd
+import plotly.graph_objects as go
+import plotly.io as pio
+
+import catalog
+import figure
+import pmc
+from benchmarks.synthetic import generate_archive
+from load_data import get_daily_load, get_rollup
+from performance import format_predictions, get_best_speed, get_race_pace_history
+from splits import get_best_splits
+from streams import get_stream_loads
+
+DEFAULT_SIZES = [1000, 10000, 100000]
+RESULTS_DIR = Path(__file__).parent / "results"
+
+
+def synthetic_archive(n_activities, seed=0):
+    """Generated archive for (n_activities, seed), reused across runs."""
+    out_dir = catalog.CACHE_DIR / "synthetic" / f"{n_activities}-seed{seed}"
+    done = out_dir / ".complete"
+    if not done.exists():
+        print(f"Generating {n_activities} activities in {out_dir}...")
+        generate_archive(out_dir, n_activities, seed)
+        done.touch()
+    return out_dir
+
+
+def best_time(fn, repeat, setup=None):
+    """Best wall-clock seconds of fn() over repeat runs, and its last result."""
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def run_stages(activities_dir, repeat):
+    """
+    Returns:
+        dict: {stage: seconds}, in pipeline order.
+    """
+    timings = {}
+    original_cache_dir = catalog.CACHE_DIR
+    with tempfile.TemporaryDirectory() as cache_dir:
+        catalog.CACHE_DIR = Path(cache_dir)
+
+        def forget_catalog():
+            catalog._catalogs.clear()
+
+        def empty_cache():
+            forget_catalog()
+            for path in Path(cache_dir).iterdir():
+                path.unlink()
+
+        try:
+            timings["list"], manifest = best_time(lambda: catalog.scan_activity_files(activities_dir), repeat)
+            names = sorted(manifest)
+            timings["parse"], _ = best_time(lambda: catalog.parse_files(activities_dir, names), repeat)
+            timings["catalog_cold"], frame = best_time(
+                lambda: catalog.load_catalog(activities_dir, workers=1), repeat, setup=empty_cache
+            )
+            timings["catalog_warm"], _ = best_time(
+                lambda: catalog.load_catalog(activities_dir), repeat, setup=forget_catalog
+            )
+            timings["stream_loads"], _ = best_time(
+                lambda: get_stream_loads(activities_dir, frame["file"].tolist()),
+                repeat,
+                setup=lambda: [p.unlink() for p in Path(cache_dir).glob("stream-loads-*")],
+            )
+            timings["best_splits"], _ = best_time(
+                lambda: get_best_splits(activities_dir, frame["file"].tolist()),
+                repeat,
+                setup=lambda: [p.unlink() for p in Path(cache_dir).glob("best-splits-*")],
+            )
+            timings["daily_load"], df_load = best_time(lambda: get_daily_load(activities_dir=activities_dir), repeat)
+            timings["rollup_cold"], _ = best_time(
+                lambda: get_rollup(activities_dir=activities_dir),
+                repeat,
+                setup=lambda: [p.unlink() for p in Path(cache_dir).glob("rollup-*")],
+            )
+            timings["rollup_warm"], _ = best_time(lambda: get_rollup(activities_dir=activities_dir), repeat)
+            timings["trends"], trends = best_time(lambda: pmc.calculate_trends(df_load), repeat)
+            timings["predictions"], _ = best_time(
+                lambda: format_predictions(get_best_speed(activities_dir)), repeat
+            )
+            timings["pace_history"], history = best_time(lambda: get_race_pace_history(activities_dir), repeat)
+
+            df_pace = None
+            if history:
+                df_pace = pd.DataFrame(history)
+                df_pace["date"] = pd.to_datetime(df_pace["date"])
+                df_pace["pace_min"] = (1000 / df_pace["speed_mps"]) / 60
+                timings["banister_fit"], _ = best_time(lambda: pmc.fit_banister(df_load, df_pace), repeat)
+
+            def build_figure():
+                figure.build_skeleton.cache_clear()
+                fig = go.Figure(figure.build_skeleton())
+                for trace, (x, y) in zip(fig.data, figure.trace_series(trends, df_pace)):
+                    trace.x = x
+                    trace.y = y
+                return fig
+
+            timings["figure_build"], fig = best_time(build_figure, repeat)
+            timings["figure_json"], _ = best_time(lambda: pio.to_json(fig, validate=False), repeat)
+        finally:
+            catalog.CACHE_DIR = original_cache_dir
+            catalog._catalogs.clear()
+    return timings
+
+
+def current_commit():
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=Path(__file__).parent, capture_output=True, text=True, check=True,
+        )
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(old_path, new_path):
+    with open(old_path) as f:
+        old = json.load(f)
+    with open(new_path) as f:
+        new = json.load(f)
+    print(f"{old['commit']} -> {new['commit']}  (new / old, >1 is slower)")
+    for size, stages in new["results"].items():
+        before = old["results"].get(size)
+        if before is None:
+            continue
+        print(f"\n{size} activities")
+        for stage, seconds in stages.items():
+            if stage in before and before[stage] > 0:
+                print(f"  {stage:<14} {before[stage]:>9.4f}s -> {seconds:>9.4f}s  x{seconds / before[stage]:.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", nargs="+", type=int, default=DEFAULT_SIZES)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", type=Path, help="results file (default: benchmarks/results/<commit>.json)")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), type=Path)
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    commit = current_commit()
+    report = {
+        "commit": commit,
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "repeat": args.repeat,
+        "seed": args.seed,
+        "results": {},
+    }
+    for size in args.sizes:
+        activities_dir = synthetic_archive(size, args.seed)
+        timings = run_stages(activities_dir, args.repeat)
+        report["results"][str(size)] = timings
+        print(f"\n{size} activities")
+        for stage, seconds in timings.items():
+            print(f"  {stage:<14} {seconds * 1000:>10.1f} ms")
+
+    output = args.output or RESULTS_DIR / f"{commit}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nSaved {output}")
+
+
+if __name__ == "__main__":
+    main()
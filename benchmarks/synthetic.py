@@ -0,0 +1,296 @@
+"""
+Synthetic Strava archive generator for benchmarks.
+
+Writes activity summaries shaped like the Strava API's (resource_state 2,
+as strava-backup saves them) plus `<id>_streams.json` files for a fraction
+of them, at Strava's "medium" stream resolution (up to 1000 points).
+Optionally a fraction are detailed activities (resource_state 3) carrying
+segment efforts, splits, laps and full polylines. The same seed always
+produces byte-identical archives.
+
+Usage:
+    python -m benchmarks.synthetic OUT_DIR N_ACTIVITIES [--seed 0] [--streams 0.05] [--detailed 0]
+"""
+import argparse
+import json
+import string
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import numpy as np
+
+# Archive spans this many years; bigger archives get denser (think a club)
+YEARS = 10
+END_DATE = datetime(2025, 12, 31, tzinfo=timezone.utc)
+
+# sport: (share, speed m/s range, moving minutes median, has distance)
+SPORTS = {
+    "Run": (0.55, (2.5, 4.2), 50, True),
+    "Ride": (0.28, (6.0, 10.0), 90, True),
+    "Walk": (0.08, (1.2, 1.6), 45, True),
+    "Swim": (0.05, (0.6, 1.0), 40, True),
+    "WeightTraining": (0.04, (0.0, 0.0), 45, False),
+}
+
+STREAM_POINTS = 1000
+POLYLINE_CHARS = string.ascii_letters + string.digits + "_@?`~{}|[]^"
+
+
+def _polyline(rng, distance):
+    # Encoded polylines run a few characters per GPS point
+    n = int(min(200 + distance / 15, 2500))
+    return "".join(rng.choice(list(POLYLINE_CHARS), n))
+
+
+def make_activity(rng, activity_id, start):
+    """One activity summary dict."""
+    names = list(SPORTS)
+    sport = names[rng.choice(len(names), p=[SPORTS[s][0] for s in names])]
+    _, (lo, hi), median_minutes, has_distance = SPORTS[sport]
+
+    moving_time = int(max(300, rng.lognormal(np.log(median_minutes * 60), 0.4)))
+    elapsed_time = moving_time + int(rng.exponential(120))
+    average_speed = float(rng.uniform(lo, hi)) if has_distance else 0.0
+    distance = round(average_speed * moving_time, 1)
+    has_heartrate = bool(rng.random() < 0.7)
+    device_watts = sport == "Ride" and bool(rng.random() < 0.6)
+    lat, lng = 12.97 + rng.normal(0, 0.05), 77.59 + rng.normal(0, 0.05)
+    hour = "Morning" if start.hour < 12 else "Afternoon" if start.hour < 17 else "Evening"
+
+    activity = {
+        "resource_state": 2,
+        "athlete": {"id": 1234567, "resource_state": 1},
+        "name": f"{hour} {sport}",
+        "distance": distance,
+        "moving_time": moving_time,
+        "elapsed_time": elapsed_time,
+        "total_elevation_gain": round(float(rng.exponential(40)) if has_distance else 0.0, 1),
+        "type": sport,
+        "sport_type": sport,
+        "workout_type": None,
+        "id": activity_id,
+        "start_date": start.strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "start_date_local": (start + timedelta(hours=5, minutes=30)).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "timezone": "(GMT+05:30) Asia/Kolkata",
+        "utc_offset": 19800.0,
+        "location_city": None,
+        "location_state": None,
+        "location_country": "India",
+        "achievement_count": int(rng.poisson(1)),
+        "kudos_count": int(rng.poisson(4)),
+        "comment_count": int(rng.poisson(0.3)),
+        "athlete_count": 1,
+        "photo_count": 0,
+        "map": {
+            "id": f"a{activity_id}",
+            "summary_polyline": _polyline(rng, distance) if has_distance else "",
+            "resource_state": 2,
+        },
+        "trainer": False,
+        "commute": False,
+        "manual": False,
+        "private": False,
+        "visibility": "everyone",
+        "flagged": False,
+        "gear_id": None,
+        "start_latlng": [round(lat, 6), round(lng, 6)] if has_distance else [],
+        "end_latlng": [round(lat + 0.001, 6), round(lng + 0.001, 6)] if has_distance else [],
+        "average_speed": round(average_speed, 3),
+        "max_speed": round(average_speed * float(rng.uniform(1.2, 1.8)), 3),
+        "has_heartrate": has_heartrate,
+        "heartrate_opt_out": False,
+        "display_hide_heartrate_option": has_heartrate,
+        "upload_id": activity_id * 10 + 7,
+        "external_id": f"{activity_id}.fit",
+        "from_accepted_tag": False,
+        "pr_count": 0,
+        "total_photo_count": 0,
+        "has_kudoed": False,
+    }
+    if has_heartrate:
+        activity["average_heartrate"] = round(float(rng.uniform(115, 165)), 1)
+        activity["max_heartrate"] = round(activity["average_heartrate"] + float(rng.uniform(10, 30)), 1)
+    if device_watts:
+        activity["device_watts"] = True
+        activity["average_watts"] = round(float(rng.uniform(120, 260)), 1)
+        activity["kilojoules"] = round(activity["average_watts"] * moving_time / 1000, 1)
+    return activity
+
+
+def _segment(rng, segment_id, sport):
+    distance = round(float(rng.uniform(300, 5000)), 1)
+    return {
+        "id": segment_id,
+        "resource_state": 2,
+        "name": f"Segment {segment_id} [{sport}]",
+        "activity_type": sport,
+        "distance": distance,
+        "average_grade": round(float(rng.normal(0, 2)), 1),
+        "maximum_grade": round(float(rng.uniform(2, 12)), 1),
+        "elevation_high": round(float(rng.uniform(900, 950)), 1),
+        "elevation_low": round(float(rng.uniform(850, 900)), 1),
+        "start_latlng": [round(12.97 + float(rng.normal(0, 0.05)), 6), round(77.59 + float(rng.normal(0, 0.05)), 6)],
+        "end_latlng": [round(12.97 + float(rng.normal(0, 0.05)), 6), round(77.59 + float(rng.normal(0, 0.05)), 6)],
+        "climb_category": 0,
+        "city": "Bengaluru",
+        "state": "Karnataka",
+        "country": "India",
+        "private": False,
+        "hazardous": False,
+        "starred": False,
+    }
+
+
+def _effort(rng, activity, name, distance, index):
+    speed = max(activity["average_speed"], 0.5) * float(rng.uniform(0.9, 1.15))
+    elapsed = int(distance / speed)
+    effort = {
+        "id": activity["id"] * 1000 + index,
+        "resource_state": 2,
+        "name": name,
+        "activity": {"id": activity["id"], "resource_state": 1},
+        "athlete": {"id": activity["athlete"]["id"], "resource_state": 1},
+        "elapsed_time": elapsed,
+        "moving_time": elapsed,
+        "start_date": activity["start_date"],
+        "start_date_local": activity["start_date_local"],
+        "distance": distance,
+        "start_index": index * 50,
+        "end_index": index * 50 + elapsed // 5,
+        "device_watts": "average_watts" in activity,
+        "pr_rank": None,
+        "achievements": [],
+    }
+    if "average_heartrate" in activity:
+        effort["average_heartrate"] = round(activity["average_heartrate"] + float(rng.normal(0, 5)), 1)
+        effort["max_heartrate"] = round(effort["average_heartrate"] + float(rng.uniform(5, 15)), 1)
+    return effort
+
+
+def make_detailed(rng, activity):
+    """The detailed (resource_state 3) form of an activity summary."""
+    sport = activity["type"]
+    distance = activity["distance"]
+    detailed = dict(activity, resource_state=3)
+    detailed["map"] = dict(activity["map"], polyline=_polyline(rng, 4 * distance) if distance else "")
+    detailed.update({
+        "description": None,
+        "calories": round(activity["moving_time"] / 60 * float(rng.uniform(8, 14)), 1),
+        "perceived_exertion": None,
+        "prefer_perceived_exertion": False,
+    })
+
+    segments = []
+    for i in range(int(rng.poisson(distance / 1500)) if distance else 0):
+        effort = _effort(rng, activity, f"Segment {i}", round(float(rng.uniform(300, 5000)), 1), i)
+        effort["segment"] = _segment(rng, int(rng.integers(1_000_000, 40_000_000)), sport)
+        effort.update({"kom_rank": None, "hidden": False})
+        segments.append(effort)
+    detailed["segment_efforts"] = segments
+
+    if distance:
+        n_splits = int(distance // 1000) + 1
+        detailed["splits_metric"] = [
+            {
+                "distance": 1000.0 if i < n_splits - 1 else round(distance % 1000, 1),
+                "elapsed_time": int(1000 / activity["average_speed"]),
+                "elevation_difference": round(float(rng.normal(0, 3)), 1),
+                "moving_time": int(1000 / activity["average_speed"]),
+                "split": i + 1,
+                "average_speed": round(activity["average_speed"] * float(rng.uniform(0.9, 1.1)), 2),
+                "average_grade_adjusted_speed": None,
+                "pace_zone": int(rng.integers(1, 6)),
+            }
+            for i in range(n_splits)
+        ]
+    detailed["laps"] = [
+        dict(_effort(rng, activity, f"Lap {i + 1}", round(distance / 3, 1), i), lap_index=i + 1, split=i + 1)
+        for i in range(3)
+    ]
+    if sport == "Run":
+        standard = [("400m", 400), ("1/2 mile", 805), ("1k", 1000), ("1 mile", 1609), ("5k", 5000), ("10k", 10000)]
+        detailed["best_efforts"] = [
+            _effort(rng, activity, name, float(d), i) for i, (name, d) in enumerate(standard) if d <= distance
+        ]
+    detailed.update({
+        "gear": {"id": "g123", "primary": True, "name": "Shoes", "resource_state": 2, "distance": 1234567.0},
+        "photos": {"primary": None, "count": 0},
+        "device_name": "Garmin Forerunner 255",
+        "embed_token": "".join(rng.choice(list(string.hexdigits.lower()), 40)),
+        "available_zones": ["heartrate", "pace"],
+    })
+    return detailed
+
+
+def make_streams(rng, activity):
+    """Strava streams (list form) for an activity, at medium resolution."""
+    duration = activity["elapsed_time"]
+    n = min(STREAM_POINTS, duration)
+    time_s = np.unique(np.linspace(0, duration, n).round().astype(int))
+    n = len(time_s)
+    moving = rng.random(n) > 0.03
+    speed = np.clip(activity["average_speed"] * (1 + 0.1 * rng.standard_normal(n)), 0, None) * moving
+    distance = np.concatenate([[0.0], np.cumsum(speed[1:] * np.diff(time_s))])
+
+    streams = [
+        {"type": "time", "data": time_s.tolist()},
+        {"type": "distance", "data": distance.round(1).tolist()},
+        {"type": "velocity_smooth", "data": speed.round(3).tolist()},
+        {"type": "moving", "data": moving.tolist()},
+        {"type": "altitude", "data": (900 + np.cumsum(rng.normal(0, 0.3, n))).round(1).tolist()},
+    ]
+    if "average_heartrate" in activity:
+        hr = activity["average_heartrate"] + np.cumsum(rng.normal(0, 0.5, n)).clip(-20, 20)
+        streams.append({"type": "heartrate", "data": hr.round().astype(int).tolist()})
+    if "average_watts" in activity:
+        watts = np.clip(activity["average_watts"] * (1 + 0.3 * rng.standard_normal(n)), 0, None) * moving
+        streams.append({"type": "watts", "data": watts.round().astype(int).tolist()})
+    for stream in streams:
+        stream.update({"series_type": "distance", "original_size": n, "resolution": "medium"})
+    return streams
+
+
+def generate_archive(out_dir, n_activities, seed=0, streams_fraction=0.05, detailed_fraction=0.0):
+    """
+    Write a synthetic archive of n_activities into out_dir.
+
+    detailed_fraction of the activities are saved in their detailed form.
+
+    Returns:
+        Path: out_dir.
+    """
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    rng = np.random.default_rng(seed)
+
+    span_seconds = int(YEARS * 365.25 * 86400)
+    offsets = np.sort(rng.integers(0, span_seconds, n_activities))
+    first = END_DATE - timedelta(seconds=span_seconds)
+
+    for i, offset in enumerate(offsets):
+        activity_id = 1_000_000_000 + i
+        activity = make_activity(rng, activity_id, first + timedelta(seconds=int(offset)))
+        if detailed_fraction and rng.random() < detailed_fraction:
+            activity = make_detailed(rng, activity)
+        with open(out_dir / f"{activity_id}.json", "w", encoding="utf-8") as f:
+            json.dump(activity, f)
+        if rng.random() < streams_fraction:
+            with open(out_dir / f"{activity_id}_streams.json", "w", encoding="utf-8") as f:
+                json.dump(make_streams(rng, activity), f)
+    return out_dir
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("out_dir", type=Path)
+    parser.add_argument("n_activities", type=int)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--streams", type=float, default=0.05, help="fraction of activities with a streams file")
+    parser.add_argument("--detailed", type=float, default=0.0, help="fraction of detailed activities")
+    args = parser.parse_args()
+    generate_archive(args.out_dir, args.n_activities, args.seed, args.streams, args.detailed)
+    print(f"Wrote {args.n_activities} activities to {args.out_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+from collections import deque
+
+import numpy as np
+
+
+class BestEffortIndex:
+    """
+    Qualifying runs sorted by date, for best-speed queries over date windows.
+
+    best_in_window is two binary searches and one lookup in a sparse table of
+    range maxima (O(n log n) to build). rolling_best gives the trailing N-day
+    best for every day in one linear pass.
+    """
+
+    def __init__(self, dates, speeds):
+        dates = np.asarray(dates).astype("datetime64[D]")
+        speeds = np.asarray(speeds, dtype=float)
+        order = np.argsort(dates, kind="stable")
+        self.dates = dates[order]
+        self.speeds = speeds[order]
+
+        # _levels[k][i] is the best of speeds[i : i + 2**k]
+        self._levels = [self.speeds]
+        width = 1
+        while 2 * width <= len(self.speeds):
+            prev = self._levels[-1]
+            self._levels.append(np.maximum(prev[:-width], prev[width:]))
+            width *= 2
+
+    def __len__(self):
+        return len(self.speeds)
+
+    def best_in_window(self, start, end):
+        """Best speed (m/s) of runs dated start..end inclusive, 0.0 if there are none."""
+        lo = int(np.searchsorted(self.dates, np.datetime64(start, "D"), side="left"))
+        hi = int(np.searchsorted(self.dates, np.datetime64(end, "D"), side="right"))
+        if hi <= lo:
+            return 0.0
+        k = (hi - lo).bit_length() - 1
+        level = self._levels[k]
+        return float(max(level[lo], level[hi - (1 << k)]))
+
+    def rolling_best(self, window_days, start=None, end=None):
+        """
+        Best speed of the trailing window_days (the day itself included) for every day.
+
+        Args:
+            window_days: window length in days.
+            start, end: first and last day reported; the first and last run by default.
+
+        Returns:
+            tuple: (days, best) arrays, best is NaN where the window holds no runs.
+        """
+        if len(self) == 0 and (start is None or end is None):
+            return np.array([], dtype="datetime64[D]"), np.array([])
+        start = self.dates[0] if start is None else np.datetime64(start, "D")
+        end = self.dates[-1] if end is None else np.datetime64(end, "D")
+
+        # Runs up to window_days - 1 before start still count towards its window
+        first = start - np.timedelta64(window_days - 1, "D")
+        n_days = int((end - first).astype(int)) + 1
+        daily = np.full(max(n_days, 0), -np.inf)
+        in_range = (self.dates >= first) & (self.dates <= end)
+        np.maximum.at(daily, (self.dates[in_range] - first).astype(int), self.speeds[in_range])
+
+        # Sliding maximum: the deque holds days with strictly decreasing bests,
+        # so its head is the best of the window
+        best = np.full(len(daily), np.nan)
+        window = deque()
+        for i, value in enumerate(daily):
+            if value > -np.inf:
+                while window and daily[window[-1]] <= value:
+                    window.pop()
+                window.append(i)
+            while window and window[0] <= i - window_days:
+                window.popleft()
+            if window:
+                best[i] = daily[window[0]]
+
+        offset = window_days - 1
+        days = first + np.arange(offset, len(daily))
+        return days, best[offset:]
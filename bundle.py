@@ -0,0 +1,56 @@
+"""
+Stage the dashboard for `shinylive export`.
+
+Under Pyodide the app can't afford to parse the raw activity archive, so the
+staged directory holds only the app's modules and the precomputed data bundle
+(snapshot.BUNDLE_PATH); the activities folder is left out entirely.
+
+Usage:
+    python bundle.py [OUT_DIR]
+    shinylive export OUT_DIR _site
+"""
+import shutil
+import sys
+from pathlib import Path
+
+from snapshot import BUNDLE_PATH, write_snapshot
+
+APP_DIR = Path(__file__).parent
+
+# Extra files shinylive needs besides the Python modules, if present
+EXTRA_FILES = ["requirements.txt"]
+
+
+def app_files():
+    """Top-level modules of the app, without tests and dev scripts."""
+    for path in sorted(APP_DIR.glob("*.py")):
+        if path.name.startswith("test_") or path.name in ("bundle.py", "main.py"):
+            continue
+        yield path
+    for name in EXTRA_FILES:
+        if (APP_DIR / name).exists():
+            yield APP_DIR / name
+
+
+def stage_app(out_dir):
+    """
+    Copy the app into out_dir together with a freshly built data bundle.
+
+    Returns:
+        Path: the bundle written, or None if there is no activity data.
+    """
+    out_dir = Path(out_dir)
+    shutil.rmtree(out_dir, ignore_errors=True)
+    out_dir.mkdir(parents=True)
+    for path in app_files():
+        shutil.copy2(path, out_dir / path.name)
+    return write_snapshot(out_dir / BUNDLE_PATH.name, compressed=True)
+
+
+if __name__ == "__main__":
+    out_dir = sys.argv[1] if len(sys.argv) > 1 else "_app"
+    bundle = stage_app(out_dir)
+    if bundle is None:
+        print("No valid activity data found.")
+        sys.exit(1)
+    print(f"Staged app in {out_dir} ({bundle.stat().st_size / 1024:.1f} KB of data)")
@@ -0,0 +1,315 @@
+import hashlib
+import json
+import os
+import pickle
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from itertools import repeat
+from pathlib import Path
+
+import pandas as pd
+
+import archive
+import metrics
+from partial_json import extract_top_level
+
+# Path to activities, a directory or a zip packed by archive.py
+# (COROEBUS_ACTIVITIES_DIR points the app at another archive)
+ACTIVITIES_DIR = Path(os.environ.get("COROEBUS_ACTIVITIES_DIR", Path(__file__).parent / "activities" / "activities"))
+
+# Name the single archive above is served under
+DEFAULT_ATHLETE = "default"
+
+# Persisted catalogs live in a dot-directory so shinylive export skips them
+CACHE_DIR = Path(os.environ.get("COROEBUS_CACHE_DIR", Path(__file__).parent / ".cache"))
+
+# Bump when the stored columns change so stale catalogs are rebuilt
+CATALOG_VERSION = 1
+
+COLUMNS = [
+    "file",
+    "date",
+    "type",
+    "moving_time",
+    "distance",
+    "average_speed",
+    "average_watts",
+    "average_heartrate",
+]
+
+NUMERIC_COLUMNS = ["moving_time", "distance", "average_speed", "average_watts", "average_heartrate"]
+
+# Activity keys extract_record reads
+RECORD_KEYS = ("start_date", "type", "moving_time", "distance", "average_speed", "average_watts", "average_heartrate")
+
+# Files at least this big (detailed activities with segment efforts, laps and
+# polylines) are decoded with partial_json; below it json.loads is faster.
+# See benchmarks/extract.py.
+PARTIAL_PARSE_MIN_BYTES = 8192
+
+# Files handed to each worker process in a parallel ingest
+CHUNK_SIZE = 256
+
+# Worker processes the ingest step parses new files with
+# (COROEBUS_INGEST_WORKERS=4; unset or 1 parses in-process)
+INGEST_WORKERS = int(os.environ.get("COROEBUS_INGEST_WORKERS", "1"))
+
+# In-process copies of catalogs already loaded, keyed by activities directory
+_catalogs = {}
+
+# Serializes catalog updates from sessions and background rebuilds
+_lock = threading.Lock()
+
+
+def configured_athletes():
+    """
+    Activity archives the dashboard serves, by athlete name.
+
+    COROEBUS_ATHLETES="alice=/data/alice,bob=/data/bob" serves several
+    athletes from one process; otherwise it's ACTIVITIES_DIR alone.
+
+    Returns:
+        dict: {name: Path}, in configured order.
+    """
+    spec = os.environ.get("COROEBUS_ATHLETES", "").strip()
+    if not spec:
+        return {DEFAULT_ATHLETE: ACTIVITIES_DIR}
+
+    athletes = {}
+    for item in spec.split(","):
+        name, sep, path = item.partition("=")
+        if not sep or not name.strip() or not path.strip():
+            raise ValueError(f"Bad COROEBUS_ATHLETES entry {item!r}, expected name=path")
+        athletes[name.strip()] = Path(path.strip())
+    return athletes
+
+
+def cache_path(activities_dir, name, suffix):
+    """Location of a cache file derived from an activities directory."""
+    key = hashlib.sha1(str(Path(activities_dir).resolve()).encode("utf-8")).hexdigest()[:12]
+    return CACHE_DIR / f"{name}-{key}{suffix}"
+
+
+def catalog_path(activities_dir=ACTIVITIES_DIR):
+    """Location of the persisted catalog for an activities directory."""
+    return cache_path(activities_dir, "catalog", ".pkl")
+
+
+def scan_activity_files(activities_dir=ACTIVITIES_DIR):
+    """
+    List activity summary files with the stat info used to detect changes.
+
+    Returns:
+        dict: {filename: (stamp, size)} for every non-stream JSON file (see archive.scan).
+    """
+    return archive.scan(activities_dir, lambda name: name.endswith(".json") and "_streams" not in name)
+
+
+def manifest_digest(manifest):
+    """Short fingerprint of a scan_activity_files() result, to tell if the archive changed."""
+    h = hashlib.sha1()
+    for name in sorted(manifest):
+        stamp, size = manifest[name]
+        h.update(f"{name}\0{stamp}\0{size}\n".encode("utf-8"))
+    return h.hexdigest()
+
+
+def _number(value, default):
+    # Strava leaves some fields null; treat them like missing keys
+    if value is None:
+        return default
+    return float(value)
+
+
+def extract_record(activity):
+    """
+    Pull the catalog columns out of a decoded activity.
+
+    Returns:
+        tuple: values for COLUMNS[1:], or None if this isn't an activity summary.
+    """
+    # We only want basic activity info (resource_state 2 or 3)
+    if not isinstance(activity, dict) or "start_date" not in activity:
+        return None
+
+    # "2024-09-10T02:15:29Z" -> "2024-09-10"; fromisoformat rejects malformed dates
+    day = date.fromisoformat(activity["start_date"][:10]).isoformat()
+
+    return (
+        day,
+        activity.get("type") or "Other",
+        _number(activity.get("moving_time"), 0.0),
+        _number(activity.get("distance"), 0.0),
+        _number(activity.get("average_speed"), 0.0),
+        _number(activity.get("average_watts"), float("nan")),
+        _number(activity.get("average_heartrate"), float("nan")),
+    )
+
+
+def decode_activity(text):
+    """
+    Decode an activity document, or just its RECORD_KEYS if it is large.
+
+    Falls back to a full json.loads when the partial decoder finds anything unusual.
+    """
+    if len(text) >= PARTIAL_PARSE_MIN_BYTES:
+        try:
+            return extract_top_level(text, RECORD_KEYS)
+        except ValueError:
+            pass
+    return json.loads(text)
+
+
+def parse_activity_file(filepath):
+    return extract_record(decode_activity(archive.read_text(filepath)))
+
+
+def parse_files(activities_dir, filenames):
+    """
+    Parse a batch of activity files.
+
+    Returns:
+        tuple: (records, skipped, errors) where records is a list of
+        (filename, *columns), skipped lists files that aren't activity
+        summaries and errors is a list of (filename, message).
+    """
+    records = []
+    skipped = []
+    errors = []
+    read = archive.reader(activities_dir)
+    for filename in filenames:
+        try:
+            record = extract_record(decode_activity(read(filename)))
+        except Exception as e:
+            errors.append((filename, str(e)))
+            continue
+        if record is None:
+            skipped.append(filename)
+        else:
+            records.append((filename,) + record)
+    return records, skipped, errors
+
+
+def parse_files_parallel(activities_dir, filenames, workers, chunk_size=CHUNK_SIZE):
+    """
+    parse_files spread over a process pool in fixed-size chunks.
+
+    Partial results are merged in submission order, so the output matches a
+    serial parse_files call on the same file list.
+    """
+    chunks = [filenames[i:i + chunk_size] for i in range(0, len(filenames), chunk_size)]
+    records = []
+    skipped = []
+    errors = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for chunk_records, chunk_skipped, chunk_errors in pool.map(parse_files, repeat(str(activities_dir)), chunks):
+            records.extend(chunk_records)
+            skipped.extend(chunk_skipped)
+            errors.extend(chunk_errors)
+    return records, skipped, errors
+
+
+def _records_to_frame(records):
+    df = pd.DataFrame.from_records(records, columns=COLUMNS)
+    df["date"] = pd.to_datetime(df["date"], format="%Y-%m-%d")
+    # Typed even when empty, so concatenating onto an empty catalog keeps float64
+    df[NUMERIC_COLUMNS] = df[NUMERIC_COLUMNS].astype(float)
+    return df
+
+
+def _empty_catalog():
+    return {"version": CATALOG_VERSION, "manifest": {}, "frame": _records_to_frame([])}
+
+
+def _read_catalog(path):
+    try:
+        with open(path, "rb") as f:
+            stored = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+        return _empty_catalog()
+
+    if not isinstance(stored, dict) or stored.get("version") != CATALOG_VERSION:
+        return _empty_catalog()
+    return stored
+
+
+def _write_catalog(path, stored):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp")
+    with open(tmp_path, "wb") as f:
+        pickle.dump(stored, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+
+
+def load_catalog(activities_dir=ACTIVITIES_DIR, workers=None):
+    """
+    Return the activity catalog, parsing only files that are new or changed.
+
+    The catalog is a DataFrame with one row per activity and the columns in
+    COLUMNS. It is persisted under CACHE_DIR together with a manifest of
+    (mtime or CRC, size) per file, so later runs only re-read what changed.
+
+    Args:
+        workers: number of worker processes for parsing. None or 1 parses in
+            this process; a pool is only started when there is more than one
+            chunk of files to read.
+    """
+    with _lock, metrics.span("load_catalog"):
+        return _load_catalog(Path(activities_dir), workers)
+
+
+def _load_catalog(activities_dir, workers):
+    path = catalog_path(activities_dir)
+
+    stored = _catalogs.get(path)
+    if stored is None:
+        stored = _read_catalog(path)
+
+    current = scan_activity_files(activities_dir)
+    manifest = stored["manifest"]
+    metrics.add(files_scanned=len(current))
+
+    stale = {name for name, stat in manifest.items() if current.get(name) != stat}
+    pending = [name for name, stat in current.items() if manifest.get(name) != stat]
+
+    if stale or pending:
+        if workers and workers > 1 and len(pending) > CHUNK_SIZE:
+            records, skipped, errors = parse_files_parallel(activities_dir, pending, workers)
+        else:
+            records, skipped, errors = parse_files(activities_dir, pending)
+        for filename, message in errors:
+            print(f"Error processing {filename}: {message}")
+        metrics.add(
+            files_parsed=len(pending),
+            bytes_read=sum(current[name][1] for name in pending),
+            parse_errors=len(errors),
+        )
+
+        frame = stored["frame"]
+        if stale:
+            frame = frame[~frame["file"].isin(stale)]
+        if records:
+            frame = pd.concat([frame, _records_to_frame(records)], ignore_index=True)
+
+        new_manifest = {name: stat for name, stat in manifest.items() if name not in stale}
+        # Files that failed to parse stay out of the manifest so they're retried
+        for filename in [r[0] for r in records] + skipped:
+            new_manifest[filename] = current[filename]
+
+        stored = {
+            "version": CATALOG_VERSION,
+            "manifest": new_manifest,
+            "frame": frame.reset_index(drop=True),
+        }
+        # Nothing to persist if the only pending files were ones that failed again
+        if stale or records or skipped:
+            _write_catalog(path, stored)
+
+    _catalogs[path] = stored
+    return stored["frame"]
+
+
+if __name__ == "__main__":
+    catalog = load_catalog()
+    print(f"Catalog holds {len(catalog)} activities ({catalog_path()})")
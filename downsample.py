@@ -0,0 +1,95 @@
+import numpy as np
+
+# Points per trace sent to the browser for the visible x-range
+TARGET_POINTS = 1000
+
+
+def lttb(x, y, n_out=TARGET_POINTS):
+    """
+    Largest-Triangle-Three-Buckets downsampling.
+
+    Keeps the first and last points and, from each of n_out - 2 equal-width
+    buckets in between, the point forming the largest triangle with the
+    previously kept point and the average of the next bucket. This keeps
+    peaks and troughs that plain striding would drop.
+
+    Args:
+        x: 1-D numeric or datetime64 array, sorted ascending.
+        y: 1-D array of the same length.
+        n_out: number of points to keep.
+
+    Returns:
+        np.ndarray: sorted indices of the kept points.
+    """
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    x = np.asarray(x)
+    if np.issubdtype(x.dtype, np.datetime64):
+        x = x.astype("datetime64[ns]").astype(np.int64)
+    x = np.asarray(x, dtype=float) - float(x[0])
+    y = np.asarray(y, dtype=float)
+
+    # Bucket k covers [edges[k], edges[k + 1]); together they span 1 .. n - 2
+    edges = (np.arange(n_out - 1) * (n - 2) // (n_out - 2)) + 1
+    starts = edges[:-1]
+    ends = edges[1:]
+
+    # Average point of every bucket, then shifted so bucket k sees bucket k + 1
+    csum_x = np.concatenate([[0.0], np.cumsum(x)])
+    csum_y = np.concatenate([[0.0], np.cumsum(y)])
+    sizes = ends - starts
+    next_x = np.append(((csum_x[ends] - csum_x[starts]) / sizes)[1:], x[-1])
+    next_y = np.append(((csum_y[ends] - csum_y[starts]) / sizes)[1:], y[-1])
+
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+
+    a = 0
+    for k in range(n_out - 2):
+        s, e = starts[k], ends[k]
+        area = np.abs(
+            (x[a] - next_x[k]) * (y[s:e] - y[a])
+            - (x[a] - x[s:e]) * (next_y[k] - y[a])
+        )
+        a = s + int(np.argmax(area))
+        selected[k + 1] = a
+
+    return selected
+
+
+def visible_slice(x, x_range):
+    """
+    Slice of a sorted x array covering x_range, plus one point either side
+    so lines run off the edges of the plot instead of stopping short.
+    """
+    if x_range is None:
+        return slice(0, len(x))
+    lo = np.searchsorted(x, x_range[0], side="left")
+    hi = np.searchsorted(x, x_range[1], side="right")
+    return slice(max(lo - 1, 0), min(hi + 1, len(x)))
+
+
+def downsample(x, y, x_range=None, n_out=TARGET_POINTS):
+    """
+    Points of one trace to draw for the current x-range.
+
+    Args:
+        x: sorted 1-D array (datetime64 for the dashboard).
+        y: 1-D array of the same length.
+        x_range: (start, end) comparable with x, or None for everything.
+        n_out: maximum number of points returned.
+
+    Returns:
+        tuple: (x, y) arrays with at most n_out points, at full resolution
+        when the window holds fewer points than that.
+    """
+    x = np.asarray(x)
+    y = np.asarray(y)
+    window = visible_slice(x, x_range)
+    x = x[window]
+    y = y[window]
+    keep = lttb(x, y, n_out)
+    return x[keep], y[keep]
@@ -0,0 +1,289 @@
+from functools import lru_cache
+
+import numpy as np
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+
+# Shared x-axes of the four subplot rows
+X_AXES = ["xaxis", "xaxis2", "xaxis3", "xaxis4"]
+
+# Properties encode_trace sets; the ones it doesn't use are reset to None
+ENCODED_PROPS = ("x", "x0", "dx", "y")
+
+
+# Title of the load row at each rollup.RESOLUTIONS
+LOAD_TITLES = {
+    "day": "Daily Training Load",
+    "week": "Weekly Training Load",
+    "month": "Monthly Training Load",
+    "year": "Yearly Training Load",
+}
+
+
+def trace_series(df, df_pace, df_best=None, load=None):
+    """
+    Full-resolution (x, y) of each data trace, in skeleton trace order:
+    load, CTL, ATL, TSB, ramp up, ramp down, race pace, rolling best pace.
+
+    Args:
+        load: optional (period starts, totals) drawn in the load row instead
+            of df's daily load, e.g. from RollupCube.series.
+    """
+    series = [
+        (df["date"], df["load"]) if load is None else load,
+        (df["date"], df["ctl"]),
+        (df["date"], df["atl"]),
+        (df["date"], df["tsb"]),
+        (df["date"], df["ramp"].clip(lower=0)),
+        (df["date"], df["ramp"].clip(upper=0)),
+    ]
+    series = [(np.asarray(x), np.asarray(y)) for x, y in series]
+
+    for frame in (df_pace, df_best):
+        if frame is None:
+            series.append((np.array([], dtype="datetime64[ns]"), np.array([])))
+        else:
+            series.append((frame["date"].to_numpy(), frame["pace_min"].to_numpy()))
+    return series
+
+
+@lru_cache(maxsize=1)
+def build_skeleton():
+    """
+    The static part of the dashboard figure: subplot grid, training zones,
+    styling, spikelines and one empty trace per entry of trace_series.
+
+    Built once per process; don't mutate the returned figure, use new_widget().
+    """
+    # Create subplots
+    fig = make_subplots(
+        rows=4, cols=1,
+        shared_xaxes=True,
+        vertical_spacing=0.08,
+        subplot_titles=(LOAD_TITLES["day"], "Form (TSB) & PMC", "Ramp Rate (7d)", "Estimated Race Pace"),
+        row_heights=[0.2, 0.4, 0.2, 0.2]
+    )
+
+    # --- Row 1: Daily Load ---
+    # Same trace settings px.line(df, x="date", y="load") used to produce
+    fig.add_trace(go.Scatter(
+        x=[], y=[],
+        name="Daily Load",
+        mode="lines",
+        showlegend=False,
+        hovertemplate="date=%{x}<br>load=%{y}<extra></extra>",
+        line=dict(color="rgba(142, 142, 147, 0.6)", width=2)
+    ), row=1, col=1)
+
+    # --- Row 2: Form (TSB), Fitness (CTL), Fatigue (ATL) ---
+    # Fitness (CTL)
+    fig.add_trace(go.Scatter(
+        x=[], y=[],
+        name="Fitness (CTL)",
+        line=dict(color="rgba(0, 191, 255, 0.6)", width=2.5)
+    ), row=2, col=1)
+
+    # Fatigue (ATL)
+    fig.add_trace(go.Scatter(
+        x=[], y=[],
+        name="Fatigue (ATL)",
+        line=dict(color="rgba(186, 85, 211, 0.6)", width=1.5)
+    ), row=2, col=1)
+
+    # Form (TSB)
+    fig.add_trace(go.Scatter(
+        x=[], y=[],
+        name="Form (TSB)",
+        line=dict(color="rgba(76, 187, 23, 0.6)", width=2.5)
+    ), row=2, col=1)
+
+    # Add Training Zones to Row 2
+    # Risk Zone: Below -30
+    fig.add_hrect(y0=-100, y1=-30, fillcolor="rgba(255, 45, 85, 0.1)", line_width=0, layer="below", annotation_text="Risk", annotation_position="top left", row=2, col=1)
+    # Optimal Zone: -30 to -10
+    fig.add_hrect(y0=-30, y1=-10, fillcolor="rgba(76, 217, 100, 0.1)", line_width=0, layer="below", annotation_text="Optimal", annotation_position="top left", row=2, col=1)
+    # Grey Zone: -10 to 5
+    fig.add_hrect(y0=-10, y1=5, fillcolor="rgba(142, 142, 147, 0.1)", line_width=0, layer="below", row=2, col=1)
+    # Fresh Zone: Above 5
+    fig.add_hrect(y0=5, y1=100, fillcolor="rgba(0, 174, 239, 0.1)", line_width=0, layer="below", annotation_text="Fresh", annotation_position="top left", row=2, col=1)
+
+    # --- Row 3: Ramp Rate ---
+    # Positive ramp (green) - ramping up
+    fig.add_trace(go.Scatter(
+        x=[], y=[],
+        name="Ramp Up",
+        line=dict(color="rgba(76, 187, 23, 0.6)", width=2),
+        fill='tozeroy',
+        fillcolor="rgba(76, 187, 23, 0.1)"
+    ), row=3, col=1)
+
+    # Negative ramp (blue) - ramping down
+    fig.add_trace(go.Scatter(
+        x=[], y=[],
+        name="Ramp Down",
+        line=dict(color="rgba(100, 149, 237, 0.6)", width=2),
+        fill='tozeroy',
+        fillcolor="rgba(100, 149, 237, 0.1)"
+    ), row=3, col=1)
+
+    # --- Row 4: Race Pace ---
+    fig.add_trace(go.Scatter(
+        x=[], y=[],
+        name="Est. Race Pace",
+        mode='lines+markers',
+        line=dict(color="rgba(255, 149, 0, 0.8)", width=2),
+        marker=dict(size=4),
+        hovertemplate="%{y:.2f} min/km<extra></extra>"
+    ), row=4, col=1)
+
+    # Best pace of the trailing prediction window; a step line, one point per change
+    fig.add_trace(go.Scatter(
+        x=[], y=[],
+        name="Rolling Best (90d)",
+        mode="lines",
+        line=dict(color="rgba(255, 59, 48, 0.7)", width=1.5, shape="hv"),
+        hovertemplate="%{y:.2f} min/km<extra></extra>"
+    ), row=4, col=1)
+
+    fig.update_yaxes(autorange="reversed", row=4, col=1)
+
+    fig.update_layout(
+        template="plotly_white",
+        height=900,
+        showlegend=True,
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=1.02,
+            xanchor="right",
+            x=1
+        ),
+        hovermode="x unified",
+        margin=dict(l=60, r=40, t=100, b=60),
+        hoverlabel=dict(
+            bgcolor="white",
+            font_size=12,
+            font_family="Inter"
+        ),
+        legend_traceorder="normal"
+    )
+
+    # Sync axes and add spikelines for "same line" effect across all subplots
+    fig.update_xaxes(
+        showspikes=True,
+        spikemode="across",
+        spikesnap="cursor",
+        spikethickness=1,
+        spikedash="solid",
+        spikecolor="#666"
+    )
+
+    fig.update_yaxes(
+        showspikes=True,
+        spikemode="across",
+        spikesnap="cursor",
+        spikethickness=1,
+        spikedash="solid",
+        spikecolor="#666"
+    )
+
+    # Update axis titles
+    fig.update_yaxes(title_text="Load", row=1, col=1)
+    fig.update_yaxes(title_text="Stress / Balance", row=2, col=1)
+    fig.update_yaxes(title_text="Ramp", row=3, col=1)
+    fig.update_yaxes(title_text="Pace (min/km)", row=4, col=1)
+    fig.update_xaxes(title_text="Date", row=4, col=1)
+    # Traces sent as x0/dx carry no dates to infer the axis type from
+    fig.update_xaxes(type="date")
+
+    # Grid lines
+    fig.update_xaxes(showgrid=True, gridcolor="rgba(235, 235, 235, 1)")
+    fig.update_yaxes(showgrid=True, gridcolor="rgba(235, 235, 235, 1)")
+
+    return fig
+
+
+def new_widget():
+    """A fresh FigureWidget of the cached skeleton, for one session's plot output."""
+    return go.FigureWidget(build_skeleton())
+
+
+def set_load_resolution(widget, resolution):
+    """
+    Title the load row for one of rollup.RESOLUTIONS; period totals are drawn
+    as steps spanning their period.
+    """
+    title = LOAD_TITLES[resolution]
+    shape = "linear" if resolution == "day" else "hv"
+    if widget.layout.annotations[0].text != title or (widget.data[0].line.shape or "linear") != shape:
+        with widget.batch_update():
+            widget.layout.annotations[0].text = title
+            widget.data[0].line.shape = shape
+
+
+def encode_trace(x, y):
+    """
+    Trace properties that place the points (x, y) on a date axis, compactly.
+
+    y goes out as a float64 array, which the widget sends as a binary typed
+    array. A regular x (every daily trace of a window that isn't downsampled,
+    the per-sport daily load, weekly rollups) becomes x0 and dx, so no dates
+    are sent at all and every trace of the window shares the same two values.
+    Any other x is sent as date strings, without the time of day when every
+    point is a midnight (all the dashboard's dates are).
+
+    Dates can't go out as numeric typed arrays: plotly.js reads numbers on a
+    date axis as instants in the browser's time zone, which would shift every
+    day by the viewer's UTC offset.
+
+    Returns:
+        dict: a value (or None) for each of ENCODED_PROPS.
+    """
+    x = np.asarray(x)
+    props = {"x": None, "x0": None, "dx": None, "y": np.ascontiguousarray(y, dtype=float)}
+    midnights = x.astype("datetime64[D]") == x
+    if len(x) >= 2 and midnights[0]:
+        step = x[1] - x[0]
+        if step > np.timedelta64(0, "ms") and (np.diff(x) == step).all():
+            props["x0"] = str(x[0].astype("datetime64[D]"))
+            props["dx"] = float(step / np.timedelta64(1, "ms"))
+            return props
+    unit = "D" if midnights.all() else "ms"
+    props["x"] = np.datetime_as_string(x.astype(f"datetime64[{unit}]"))
+    return props
+
+
+def encoded_bytes(props):
+    """Approximate bytes of data an encode_trace result puts in the update message."""
+    size = props["y"].nbytes
+    if props["x"] is not None:
+        # Quotes and separator around each date string
+        size += sum(len(date) + 3 for date in props["x"])
+    return size
+
+
+def patch_traces(widget, points, sent):
+    """
+    Send changed trace arrays to an existing widget in one batched update,
+    encoded with encode_trace.
+
+    Args:
+        widget: FigureWidget from new_widget().
+        points: list of (x, y) per trace, as from trace_series().
+        sent: list with the (x, y) last sent for each trace (None if never);
+            updated in place.
+
+    Returns:
+        int: bytes of trace data sent (0 if nothing changed), see encoded_bytes.
+    """
+    payload = 0
+    with widget.batch_update():
+        for i, (trace, (x, y)) in enumerate(zip(widget.data, points)):
+            last = sent[i]
+            if last is not None and np.array_equal(last[0], x) and np.array_equal(last[1], y):
+                continue
+            props = encode_trace(x, y)
+            trace.update({key: props[key] for key in ENCODED_PROPS})
+            sent[i] = (x, y)
+            payload += encoded_bytes(props)
+    return payload
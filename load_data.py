@@ -1,12 +1,78 @@
-import json
 import os
+import numpy as np
 import pandas as pd
-from pathlib import Path
-from datetime import datetime
+import metrics
+import rollup
+from catalog import ACTIVITIES_DIR, cache_path, load_catalog
+from streams import get_stream_loads
 
-# Path to activities
-ACTIVITIES_DIR = Path(__file__).parent / "activities" / "activities"
+# "heuristic": calculate_load on summary fields
+# "streams": NP / hrTSS from the *_streams.json files, heuristic where missing
+LOAD_MODES = ("heuristic", "streams")
 
+# Catalog rows turned into loads at a time by get_daily_load, which bounds its
+# temporary arrays however many activities the archive holds
+AGGREGATE_CHUNK = 16384
+
+class DailyTotals:
+    """
+    Running sums by day in a preallocated, day-indexed array.
+
+    Chunks of (day, value) pairs can come in any order. The array grows (at
+    least doubling) when a chunk reaches past either end of the days it
+    covers, so its size follows the date range, not the number of activities.
+    """
+
+    def __init__(self, capacity=366):
+        self._totals = np.zeros(capacity)
+        # Day number (days since the epoch) of _totals[0]
+        self._origin = None
+        self.first = None
+        self.last = None
+
+    def add(self, days, values):
+        """
+        Args:
+            days: dates of the values, as datetime64.
+            values: number added to each one's day.
+        """
+        days = np.asarray(days).astype("datetime64[D]").astype(np.int64)
+        if len(days) == 0:
+            return
+        lo, hi = int(days.min()), int(days.max())
+        self._reserve(lo, hi)
+        start = lo - self._origin
+        self._totals[start:start + hi - lo + 1] += np.bincount(days - lo, weights=values, minlength=hi - lo + 1)
+        self.first = lo if self.first is None else min(self.first, lo)
+        self.last = hi if self.last is None else max(self.last, hi)
+
+    def _reserve(self, lo, hi):
+        """Grow the array to cover days lo..hi."""
+        if self._origin is None:
+            self._origin = lo
+        capacity = len(self._totals)
+        end = self._origin + capacity
+        if lo >= self._origin and hi < end:
+            return
+        size = max(2 * capacity, max(end, hi + 1) - min(self._origin, lo))
+        # The headroom goes on the side that ran out
+        origin = self._origin if lo >= self._origin else max(end, hi + 1) - size
+        totals = np.zeros(size)
+        totals[self._origin - origin:self._origin - origin + capacity] = self._totals
+        self._totals, self._origin = totals, origin
+
+    def series(self):
+        """
+        Returns:
+            tuple: (days, totals) from the first to the last day added, with
+            days that got nothing as 0.
+        """
+        if self.first is None:
+            return np.array([], dtype="datetime64[D]"), np.zeros(0)
+        days = np.arange(self.first, self.last + 1).astype("datetime64[D]")
+        return days, self._totals[self.first - self._origin:self.last - self._origin + 1].copy()
+
+@metrics.timed()
 def calculate_load(activity):
     """
     Simulate a Training Stress Score (TSS) like metric.
@@ -31,56 +97,122 @@ def calculate_load(activity):
         
     return load
 
-def get_daily_load():
-    data = []
-    
-    if not os.path.exists(ACTIVITIES_DIR):
-        print(f"Directory not found: {ACTIVITIES_DIR}")
+@metrics.timed()
+def calculate_loads(catalog):
+    """
+    Vectorized calculate_load over every row of the activity catalog.
+    """
+    metrics.add(activities=len(catalog))
+    base_load = (catalog["moving_time"].to_numpy(dtype=float) / 3600) * 50
+    avg_watts = catalog["average_watts"].fillna(0).to_numpy(dtype=float)
+    avg_hr = catalog["average_heartrate"].fillna(0).to_numpy(dtype=float)
+
+    # Same precedence as calculate_load: power, then HR, then time only
+    return np.where(
+        avg_watts != 0,
+        base_load * (avg_watts / 200),
+        np.where(avg_hr != 0, base_load * (avg_hr / 140), base_load),
+    )
+
+def activity_loads(catalog, load_mode, activities_dir, stream_loads=None):
+    """
+    Load of every catalog row for one of LOAD_MODES.
+
+    Args:
+        stream_loads: get_stream_loads of these rows, if already read.
+    """
+    loads = calculate_loads(catalog)
+    if load_mode == "streams":
+        if stream_loads is None:
+            stream_loads = get_stream_loads(activities_dir, catalog["file"].tolist())
+        loads = np.where(np.isnan(stream_loads), loads, stream_loads)
+    return loads
+
+@metrics.timed()
+def get_daily_load(workers=None, load_mode="heuristic", activities_dir=ACTIVITIES_DIR):
+    """
+    Daily training load with missing days filled with 0.
+
+    Loads are computed AGGREGATE_CHUNK catalog rows at a time and summed
+    straight into a DailyTotals array, so no per-activity frame is grouped
+    or reindexed.
+
+    Args:
+        workers: worker processes used to parse new activity files (see load_catalog).
+        load_mode: one of LOAD_MODES.
+        activities_dir: archive to read, ACTIVITIES_DIR by default.
+    """
+    if load_mode not in LOAD_MODES:
+        raise ValueError(f"Unknown load_mode {load_mode!r}, expected one of {LOAD_MODES}")
+
+    if not os.path.exists(activities_dir):
+        print(f"Directory not found: {activities_dir}")
         return
 
-    files = [f for f in os.listdir(ACTIVITIES_DIR) if f.endswith(".json") and "_streams" not in f]
-    print(f"Processing {len(files)} activity files...")
-    
-    for filename in files:
-        filepath = os.path.join(ACTIVITIES_DIR, filename)
-        try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                activity = json.load(f)
-                
-                # We only want basic activity info (resource_state 2 or 3)
-                if not isinstance(activity, dict) or "start_date" not in activity:
-                    continue
-                    
-                date_str = activity["start_date"]
-                # Convert "2024-09-10T02:15:29Z" to date
-                date = datetime.strptime(date_str, "%Y-%m-%dT%H:%M:%SZ").date()
-                
-                load = calculate_load(activity)
-                
-                data.append({
-                    "date": date,
-                    "load": load,
-                    "type": activity.get("type", "Other")
-                })
-        except Exception as e:
-            print(f"Error processing {filename}: {e}")
-
-    if not data:
+    catalog = load_catalog(activities_dir, workers=workers)
+    print(f"Processing {len(catalog)} activities...")
+
+    if catalog.empty:
         print("No valid activity data found.")
         return
 
-    df = pd.DataFrame(data)
-    
-    # Aggregate by date
-    daily_load = df.groupby("date")["load"].sum().reset_index()
-    
-    # Fill missing dates with 0 load
-    all_dates = pd.date_range(start=daily_load["date"].min(), end=daily_load["date"].max())
-    daily_load["date"] = pd.to_datetime(daily_load["date"])
-    daily_load = daily_load.set_index("date").reindex(all_dates, fill_value=0).reset_index()
-    daily_load.columns = ["date", "load"]
+    dates = catalog["date"].to_numpy()
+    # Stream loads come from one cache file, read once for all chunks
+    stream_loads = None
+    if load_mode == "streams":
+        stream_loads = get_stream_loads(activities_dir, catalog["file"].tolist())
+
+    totals = DailyTotals()
+    for start in range(0, len(catalog), AGGREGATE_CHUNK):
+        rows = slice(start, start + AGGREGATE_CHUNK)
+        loads = activity_loads(
+            catalog.iloc[rows], load_mode, activities_dir,
+            None if stream_loads is None else stream_loads[rows],
+        )
+        totals.add(dates[rows], loads)
+
+    # Gap-filled already: days without activities are 0
+    days, load = totals.series()
+    daily_load = pd.DataFrame({"date": days.astype(dates.dtype), "load": load})
+    metrics.add(activities=len(catalog), days=len(daily_load))
     
     return daily_load
 
+@metrics.timed()
+def get_rollup(workers=None, load_mode="heuristic", activities_dir=ACTIVITIES_DIR):
+    """
+    Load, moving time and distance by day and sport type, with weekly, monthly
+    and yearly rollups (see rollup.RollupCube).
+
+    The cube and the activity rows it was built from are kept under CACHE_DIR;
+    later calls only re-sum the days whose activities were added, removed or
+    changed since.
+
+    Returns:
+        RollupCube: None if the activities folder is missing.
+    """
+    if load_mode not in LOAD_MODES:
+        raise ValueError(f"Unknown load_mode {load_mode!r}, expected one of {LOAD_MODES}")
+    if not os.path.exists(activities_dir):
+        return None
+
+    catalog = load_catalog(activities_dir, workers=workers)
+    values = np.column_stack([
+        activity_loads(catalog, load_mode, activities_dir),
+        catalog["moving_time"].to_numpy(dtype=float),
+        catalog["distance"].to_numpy(dtype=float),
+    ])
+
+    path = cache_path(activities_dir, f"rollup-{load_mode}", ".npz")
+    cube, records = rollup.read_state(path)
+    new_cube, new_records = rollup.update_cube(cube, records, catalog["file"], catalog["date"], catalog["type"], values)
+    if new_cube is not cube:
+        rollup.write_state(path, new_cube, new_records)
+    metrics.add(activities=len(catalog), sports=len(new_cube.sports))
+    return new_cube
+
 if __name__ == "__main__":
-    main()
+    # Ingest step: refresh the catalog and the dashboard's startup snapshot
+    from snapshot import write_snapshot
+    path = write_snapshot()
+    print(f"Snapshot written to {path}" if path else "No valid activity data found.")
@@ -0,0 +1,115 @@
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+# Upper bound on what SharedCache holds before evicting least recently used results
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+def approx_size(value):
+    """
+    Rough memory footprint in bytes of a cached result.
+
+    Objects such as rollup.RollupCube and best_efforts.BestEffortIndex count
+    their attributes, so the arrays they hold are included; an array held in
+    several places is counted once.
+    """
+    return _size(value, set())
+
+
+def _size(value, seen):
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(index=True, deep=True))
+    if isinstance(value, (str, bytes, int, float, bool, type(None), np.generic)):
+        return sys.getsizeof(value)
+
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(_size(k, seen) + _size(v, seen) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(_size(v, seen) for v in value)
+    if hasattr(value, "__dict__") and not isinstance(value, type):
+        return sys.getsizeof(value) + _size(vars(value), seen)
+    return sys.getsizeof(value)
+
+
+class SharedCache:
+    """
+    Process-wide memo of results, shared by every session.
+
+    Keys should identify everything a result depends on, e.g. (name, athlete,
+    data version, *params). Results are evicted least recently used first once
+    their combined approx_size goes over max_bytes. Cached values are shared,
+    so callers must treat them as read-only.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()  # key -> (value, size)
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key, compute):
+        """
+        Cached result for key, calling compute() to fill it on a miss.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+
+        # Computed outside the lock; two callers racing on the same key both
+        # compute and the later one wins, which is harmless for pure results
+        value = compute()
+        self.put(key, value)
+        return value
+
+    def put(self, key, value):
+        size = approx_size(value)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            if size > self.max_bytes:
+                # Wouldn't fit even on its own; don't flush everything for it
+                return
+            self._entries[key] = (value, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        """
+        Returns:
+            dict: hits, misses, evictions, entries and bytes currently held.
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+            }
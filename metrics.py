@@ -0,0 +1,131 @@
+import contextvars
+import functools
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# Timing and counter hooks for the hot paths. Off unless COROEBUS_METRICS is
+# set (or enable() is called); while off, a hooked call costs one flag check.
+# Every finished span is kept in memory for the app's debug panel and /metrics
+# endpoint, and logged as one JSON line to the "coroebus.metrics" logger
+# (stderr, or the file named by COROEBUS_METRICS_LOG).
+ENABLED = os.environ.get("COROEBUS_METRICS", "") not in ("", "0")
+
+# Finished spans kept for recent()
+RECENT_SPANS = 200
+
+logger = logging.getLogger("coroebus.metrics")
+
+_current = contextvars.ContextVar("metrics_span", default=None)
+_recent = deque(maxlen=RECENT_SPANS)
+_totals = {}
+_lock = threading.Lock()
+
+
+def _configure_logger():
+    if logger.handlers:
+        return
+    log_path = os.environ.get("COROEBUS_METRICS_LOG")
+    handler = logging.FileHandler(log_path) if log_path else logging.StreamHandler(sys.stderr)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+
+def enable(on=True):
+    global ENABLED
+    ENABLED = on
+    if on:
+        _configure_logger()
+
+
+if ENABLED:
+    _configure_logger()
+
+
+def add(**counters):
+    """Add to the counters of the innermost open span (no-op outside one or when disabled)."""
+    if not ENABLED:
+        return
+    span_counters = _current.get()
+    if span_counters is None:
+        return
+    for key, value in counters.items():
+        span_counters[key] = span_counters.get(key, 0) + value
+
+
+@contextmanager
+def span(name):
+    """Time a block as one span; add() inside it attaches counters."""
+    if not ENABLED:
+        yield
+        return
+
+    counters = {}
+    token = _current.set(counters)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        duration_ms = (time.perf_counter() - start) * 1000
+        _current.reset(token)
+        _record(name, duration_ms, counters)
+
+
+def timed(name=None):
+    """Decorator form of span(), named after the function by default."""
+    def decorator(fn):
+        span_name = name or fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not ENABLED:
+                return fn(*args, **kwargs)
+            with span(span_name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def _record(name, duration_ms, counters):
+    event = {"span": name, "at": round(time.time(), 3), "ms": round(duration_ms, 3), **counters}
+    with _lock:
+        _recent.append(event)
+        total = _totals.setdefault(name, {"calls": 0, "total_ms": 0.0, "max_ms": 0.0, "last_ms": 0.0, "counters": {}})
+        total["calls"] += 1
+        total["total_ms"] += duration_ms
+        total["max_ms"] = max(total["max_ms"], duration_ms)
+        total["last_ms"] = duration_ms
+        for key, value in counters.items():
+            total["counters"][key] = total["counters"].get(key, 0) + value
+    logger.info(json.dumps(event))
+
+
+def summary():
+    """
+    Returns:
+        dict: {span name: {calls, total_ms, mean_ms, max_ms, last_ms, counters}}.
+    """
+    with _lock:
+        return {
+            name: {**total, "mean_ms": total["total_ms"] / total["calls"], "counters": dict(total["counters"])}
+            for name, total in _totals.items()
+        }
+
+
+def recent(n=RECENT_SPANS):
+    """The last n finished spans, oldest first."""
+    with _lock:
+        return list(_recent)[-n:]
+
+
+def reset():
+    with _lock:
+        _recent.clear()
+        _totals.clear()
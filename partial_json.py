@@ -0,0 +1,90 @@
+import json
+import re
+
+# Decoding primitives of the json module (C-accelerated where available)
+_scan_once = json.JSONDecoder().scan_once
+_scanstring = json.decoder.scanstring
+_whitespace = re.compile(r"[ \t\n\r]*")
+# A member's key (without escapes) and the colon after it
+_member_key = re.compile(r'"([^"\\]*)"[ \t\n\r]*:[ \t\n\r]*')
+# The separator after a member's value
+_separator = re.compile(r"[ \t\n\r]*([,}])[ \t\n\r]*")
+
+
+def extract_top_level(text, keys):
+    """
+    Decode only the given top-level keys of a JSON object.
+
+    Walks the top-level members in order and stops as soon as every key has
+    been seen, so nested arrays that come after them (segment efforts, laps,
+    splits, polylines) are never decoded. Keys that don't occur anywhere
+    further down the text can't be top-level members, which lets the walk stop
+    early when some of them are missing too. Values of other members are
+    skipped with the json module's own scanner, one member at a time.
+
+    Unlike json.loads this takes the first of duplicated keys and doesn't
+    validate the text after the last key it needs.
+
+    Returns:
+        dict: the keys found, with their decoded values.
+
+    Raises:
+        ValueError: if the text isn't a JSON object or looks unusual (the
+        caller should fall back to json.loads).
+    """
+    keys = set(keys)
+    found = {}
+    # Position of the next occurrence of each missing key anywhere in the text
+    next_seen = dict.fromkeys(keys, -1)
+    member_key = _member_key.match
+    separator = _separator.match
+
+    try:
+        i = _whitespace.match(text).end()
+        if text[i] != "{" or not text.rstrip().endswith("}"):
+            raise ValueError("not a JSON object")
+        i = _whitespace.match(text, i + 1).end()
+        if text[i] == "}":
+            return found
+
+        while True:
+            m = member_key(text, i)
+            if m is None:
+                raise ValueError(f"expected a key at {i}")
+            key, i = m.group(1), m.end()
+
+            char = text[i]
+            if key in keys and key not in found:
+                found[key], i = _scan_once(text, i)
+                if len(found) == len(keys):
+                    return found
+            elif char == '"':
+                _, i = _scanstring(text, i + 1)
+            else:
+                if char in "[{" and _all_missing_absent(text, i, keys, found, next_seen):
+                    return found
+                _, i = _scan_once(text, i)
+
+            m = separator(text, i)
+            if m is None:
+                raise ValueError(f"expected ',' or '}}' at {i}")
+            if m.group(1) == "}":
+                return found
+            i = m.end()
+    except (IndexError, StopIteration) as e:
+        raise ValueError(f"unexpected end of JSON text: {e}") from None
+
+
+def _all_missing_absent(text, i, keys, found, next_seen):
+    """True if no key still missing occurs (even nested) at or after position i."""
+    for key in keys:
+        if key in found:
+            continue
+        if next_seen[key] < i:
+            next_seen[key] = text.find(f'"{key}"', i)
+            if next_seen[key] == -1:
+                # Absent for the rest of the text, never search again
+                next_seen[key] = len(text)
+        if next_seen[key] < len(text):
+            return False
+    return True
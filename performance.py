@@ -1,10 +1,16 @@
-import json
-import os
 from datetime import datetime, timedelta
 from pathlib import Path
+import metrics
+from best_efforts import BestEffortIndex
+from catalog import ACTIVITIES_DIR, load_catalog
+from splits import SPLIT_DISTANCES, get_best_splits
 
-# Path to activities
-ACTIVITIES_DIR = Path(__file__).parent / "activities" / "activities"
+# Predictions use the best qualifying run of this many most recent days
+PREDICTION_WINDOW_DAYS = 90
+
+# A run's reference speed is its fastest stretch of this split when it has a
+# distance stream, its average speed otherwise
+REFERENCE_SPLIT = "5k"
 
 def get_pace_string(speed_mps):
     """Convert speed in m/s to min/km string (e.g. '5:00')."""
@@ -16,86 +22,72 @@ def get_pace_string(speed_mps):
     seconds = int(seconds_per_km % 60)
     return f"{minutes}:{seconds:02d}"
 
-def calculate_predictions():
+def _qualifying_runs(activities_dir=ACTIVITIES_DIR):
+    """Runs strictly longer than 5km from the shared activity catalog."""
+    catalog = load_catalog(activities_dir)
+    return catalog[(catalog["type"] == "Run") & (catalog["distance"] > 5000)]
+
+def run_speeds(activities_dir, runs):
     """
-    Calculate race pace, zone 2 pace, and easy pace based on recent run history.
-    
+    Reference speed (m/s) of each run: its best REFERENCE_SPLIT from streams, else its average speed.
+    """
+    column = list(SPLIT_DISTANCES).index(REFERENCE_SPLIT)
+    split_times = get_best_splits(activities_dir, runs["file"].tolist())[:, column]
+    has_split = split_times > 0
+    metrics.add(runs_with_splits=int(has_split.sum()))
+    speeds = runs["average_speed"].to_numpy(dtype=float, copy=True)
+    speeds[has_split] = SPLIT_DISTANCES[REFERENCE_SPLIT] / split_times[has_split]
+    return speeds
+
+def best_effort_index(activities_dir=ACTIVITIES_DIR):
+    """
+    Date-sorted index of the qualifying runs (> 5km, with a speed), see run_speeds.
     Returns:
-        dict: containing formatted strings for different paces.
+        BestEffortIndex: empty if the activities folder is missing or unreadable.
     """
-    
-    cutoff_date = datetime.now().date() - timedelta(days=90)
-    best_speed_mps = 0.0
-    
-    if not ACTIVITIES_DIR.exists():
-        return {
-            "race_pace": "-",
-            "zone2_pace": "-",
-            "easy_pace": "-"
-        }
+    if not Path(activities_dir).exists():
+        return BestEffortIndex([], [])
 
-    # Find best speed in runs > 5km in last 90 days
     try:
-        if not ACTIVITIES_DIR.exists():
-             print(f"Directory not found: {ACTIVITIES_DIR}")
-             return { "race_pace": "-", "zone2_pace": "-", "easy_pace": "-" }
-             
-        # Use os.listdir to be safe
-        files = os.listdir(ACTIVITIES_DIR)
-        activity_files = [ACTIVITIES_DIR / f for f in files if f.endswith(".json")]
-        
-        # print(f"Scanning directory: {ACTIVITIES_DIR}")
-        # print(f"Found {len(activity_files)} files.")
-        
-        for file_path in activity_files:
-            # Skip stream files
-            if "_streams" in file_path.name:
-                continue
-                
-            try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    activity = json.load(f)
-                    
-                    # Check if it's a Run
-                    if activity.get("type") != "Run":
-                        continue
-                        
-                    # Check date
-                    date_str = activity.get("start_date")
-                    if not date_str:
-                        continue
-                        
-                    # Parse date (handle Z if present)
-                    date_dt = datetime.strptime(date_str.replace("Z", ""), "%Y-%m-%dT%H:%M:%S").date()
-                    
-                    if date_dt < cutoff_date:
-                        # print(f"Skipping {file_path.name}: Date {date_dt} < {cutoff_date}")
-                        # Keep it commented to avoid spam, but useful if we enable it.
-                        pass
-                        
-                    # Check distance (meters) - strictly > 5000m
-                    distance = activity.get("distance", 0)
-                    if distance <= 5000:
-                        # print(f"Skipping {file_path.name}: Distance {distance} <= 5000")
-                        continue
-                        
-                    # Check speed
-                    avg_speed = activity.get("average_speed", 0)
-                    # print(f"Candidate: {file_path.name}, Date: {date_dt}, Dist: {distance}, Speed: {avg_speed}")
-                    if avg_speed > best_speed_mps:
-                        best_speed_mps = avg_speed
-                        
-            except Exception:
-                continue
-                
+        runs = _qualifying_runs(activities_dir)
+        speeds = run_speeds(activities_dir, runs)
+        keep = speeds > 0
+        metrics.add(runs=int(keep.sum()))
+        return BestEffortIndex(runs["date"].to_numpy()[keep], speeds[keep])
     except Exception as e:
         print(f"Error scanning activities: {e}")
-        return {
-            "race_pace": "-",
-            "zone2_pace": "-",
-            "easy_pace": "-"
-        }
+        return BestEffortIndex([], [])
+
+def prediction_window(today=None):
+    """First and last day (inclusive) of the runs predictions are based on."""
+    today = today or datetime.now().date()
+    return today - timedelta(days=PREDICTION_WINDOW_DAYS - 1), today
 
+@metrics.timed()
+def get_best_speed(activities_dir=ACTIVITIES_DIR, today=None):
+    """
+    Best reference speed (m/s) of runs > 5km in the last 90 days, 0.0 if none.
+    """
+    return best_effort_index(activities_dir).best_in_window(*prediction_window(today))
+
+@metrics.timed()
+def calculate_predictions():
+    """
+    Calculate race pace, zone 2 pace, and easy pace based on recent run history.
+    
+    Returns:
+        dict: containing formatted strings for different paces.
+    """
+    return format_predictions(get_best_speed())
+
+@metrics.timed()
+def format_predictions(best_speed_mps):
+    """
+    Pace prediction strings derived from a reference (best) run speed.
+    
+    Returns:
+        dict: containing formatted strings for different paces.
+    """
     if best_speed_mps == 0:
          return {
             "race_pace": "-",
@@ -123,56 +115,15 @@ def calculate_predictions():
         "easy_pace": easy_str
     }
 
-def get_race_pace_history():
+@metrics.timed()
+def get_race_pace_history(activities_dir=ACTIVITIES_DIR):
     """
     Extract historical race pace data from activities.
     Returns:
         list of dicts: [{"date": date_obj, "speed_mps": float}, ...]
     """
-    history = []
-    
-    if not ACTIVITIES_DIR.exists():
-        return history
-
-    try:
-        files = os.listdir(ACTIVITIES_DIR)
-        activity_files = [ACTIVITIES_DIR / f for f in files if f.endswith(".json")]
-        
-        for file_path in activity_files:
-            if "_streams" in file_path.name:
-                continue
-                
-            try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    activity = json.load(f)
-                    
-                    if activity.get("type") != "Run":
-                        continue
-                        
-                    date_str = activity.get("start_date")
-                    if not date_str:
-                        continue
-                        
-                    date_dt = datetime.strptime(date_str.replace("Z", ""), "%Y-%m-%dT%H:%M:%S").date()
-                    
-                    distance = activity.get("distance", 0)
-                    if distance <= 5000:
-                        continue
-                        
-                    avg_speed = activity.get("average_speed", 0)
-                    if avg_speed > 0:
-                        history.append({
-                            "date": date_dt,
-                            "speed_mps": avg_speed
-                        })
-                        
-            except Exception:
-                continue
-                
-        # Sort by date
-        history.sort(key=lambda x: x["date"])
-        
-    except Exception as e:
-        print(f"Error getting history: {e}")
-    history = [{"date": rec["date"].isoformat(), "speed_mps": rec["speed_mps"]} for rec in history]
-    return history
+    index = best_effort_index(activities_dir)
+    return [
+        {"date": str(day), "speed_mps": float(speed)}
+        for day, speed in zip(index.dates, index.speeds)
+    ]
@@ -0,0 +1,276 @@
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import metrics
+
+# Banister model defaults (see README "Customization")
+DEFAULT_CTL_DAYS = 42  # Fitness (CTL) Days
+DEFAULT_ATL_DAYS = 7   # Fatigue (ATL) Days
+
+# Ramp Rate window: CTL(t) - CTL(t-7)
+RAMP_DAYS = 7
+
+# Time constants (days, inclusive) searched by fit_banister; the app's slider ranges
+FIT_CTL_DAYS = (7, 90)
+FIT_ATL_DAYS = (1, 21)
+
+# Fewest performances fit_banister will fit to
+FIT_MIN_PERFORMANCES = 10
+
+# Days handled per vectorized block. Keeps alpha ** -BLOCK_DAYS finite for
+# any time constant >= 1 day while leaving only a short loop over blocks.
+BLOCK_DAYS = 64
+
+
+def ewma_batch(loads, time_constants, initial=0.0):
+    """
+    Banister exponential averages of a load series for several time constants.
+
+    Computes, for every time constant tc at once,
+        y[t] = y[t-1] * a + load[t] * (1 - a),  a = e^(-1/tc),  y[-1] = initial
+    as a linear filter: inside each block of BLOCK_DAYS days the response is
+    a scaled cumulative sum, and only the carry between blocks is sequential.
+
+    Args:
+        loads: 1-D array of daily loads.
+        time_constants: iterable of time constants in days (each >= 1).
+        initial: value of y before the first day, scalar or one per constant.
+
+    Returns:
+        np.ndarray: shape (len(time_constants), len(loads)).
+    """
+    loads = np.asarray(loads, dtype=float)
+    tcs = np.atleast_1d(np.asarray(time_constants, dtype=float))
+    if np.any(tcs < 1):
+        raise ValueError("Time constants must be at least 1 day")
+
+    n_days = len(loads)
+    n_blocks = -(-n_days // BLOCK_DAYS)
+
+    alpha = np.exp(-1.0 / tcs)[:, None, None]
+    steps = np.arange(BLOCK_DAYS)
+    grow = alpha ** -steps          # a^-j
+    shrink = alpha ** steps         # a^j
+    carry_gain = alpha[:, 0] ** (steps + 1)  # a^(j+1), shape (K, BLOCK_DAYS)
+
+    padded = np.zeros(n_blocks * BLOCK_DAYS)
+    padded[:n_days] = loads
+    blocks = padded.reshape(n_blocks, BLOCK_DAYS)
+
+    # Response of every block to its own loads, starting from zero
+    local = (1 - alpha) * shrink * np.cumsum(blocks * grow, axis=-1)
+
+    out = np.empty_like(local)
+    carry = np.broadcast_to(np.asarray(initial, dtype=float), tcs.shape).copy()
+    for b in range(n_blocks):
+        out[:, b] = local[:, b] + carry_gain * carry[:, None]
+        carry = out[:, b, -1]
+
+    return out.reshape(len(tcs), -1)[:, :n_days]
+
+
+def _read_state(state_path):
+    try:
+        with np.load(state_path) as state:
+            return {key: state[key] for key in state.files}
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def _write_state(state_path, **arrays):
+    state_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = state_path.with_suffix(".tmp")
+    with open(tmp_path, "wb") as f:
+        np.savez(f, **arrays)
+    os.replace(tmp_path, state_path)
+
+
+def _restart_day(state, start, loads, time_constants):
+    """
+    First day whose CTL/ATL must be recomputed, or None for a full recompute.
+
+    Restarts are aligned to BLOCK_DAYS so the resumed filter performs exactly
+    the same floating point operations as a recompute from day zero.
+    """
+    if state is None:
+        return None
+    if state["start"] != start or not np.array_equal(state["time_constants"], time_constants):
+        return None
+
+    old_loads = state["loads"]
+    common = min(len(old_loads), len(loads))
+    changed = np.flatnonzero(old_loads[:common] != loads[:common])
+    first_changed = changed[0] if len(changed) else common
+    if first_changed == len(loads) == len(old_loads):
+        return len(loads)
+
+    return (first_changed // BLOCK_DAYS) * BLOCK_DAYS
+
+
+@metrics.timed()
+def calculate_trends(df_load, ctl_days=DEFAULT_CTL_DAYS, atl_days=DEFAULT_ATL_DAYS, state_path=None):
+    """
+    Add Fitness (CTL), Fatigue (ATL), Form (TSB) and 7-day ramp columns.
+
+    Args:
+        state_path: optional .npz file holding the loads and CTL/ATL series of
+            the previous call. When given, only days from the block containing
+            the earliest changed load onwards are recomputed, and the state is
+            written back for the next call. Results are identical to a full
+            recompute.
+
+    Returns:
+        DataFrame: copy of df_load with "ctl", "atl", "tsb" and "ramp".
+    """
+    loads = df_load["load"].to_numpy(dtype=float)
+    time_constants = np.array([ctl_days, atl_days], dtype=float)
+
+    if state_path is None:
+        ctl, atl = ewma_batch(loads, time_constants)
+        metrics.add(days=len(loads), days_computed=len(loads))
+    else:
+        state_path = Path(state_path)
+        start = np.datetime64(df_load["date"].iloc[0], "D") if len(df_load) else np.datetime64("NaT", "D")
+        state = _read_state(state_path)
+        restart = _restart_day(state, start, loads, time_constants)
+
+        if restart is None or restart == 0:
+            ctl, atl = ewma_batch(loads, time_constants)
+        else:
+            # Resume from the checkpoint at the end of the last unchanged block
+            initial = [state["ctl"][restart - 1], state["atl"][restart - 1]]
+            ctl_tail, atl_tail = ewma_batch(loads[restart:], time_constants, initial=initial)
+            ctl = np.concatenate([state["ctl"][:restart], ctl_tail])
+            atl = np.concatenate([state["atl"][:restart], atl_tail])
+        metrics.add(days=len(loads), days_computed=len(loads) - (restart or 0))
+
+        if restart != len(loads):
+            _write_state(state_path, start=start, time_constants=time_constants, loads=loads, ctl=ctl, atl=atl)
+
+    return trends_frame(df_load, ctl, atl)
+
+
+def trends_frame(df_load, ctl, atl):
+    """
+    Copy of df_load with "ctl", "atl", "tsb" and "ramp" from precomputed CTL/ATL
+    series. df_load itself is left alone: the app shares it between sessions.
+    """
+    df = df_load.copy()
+    df["ctl"] = ctl
+    df["atl"] = atl
+    df["tsb"] = df["ctl"] - df["atl"]
+    df["ramp"] = df["ctl"].diff(RAMP_DAYS).fillna(0)
+
+    return df
+
+
+def pmc_sweep(loads, pairs):
+    """
+    CTL/ATL/TSB for a grid of (CTL days, ATL days) pairs in one batched call.
+
+    Each distinct time constant is filtered once, however many pairs use it.
+
+    Args:
+        loads: 1-D array of daily loads.
+        pairs: iterable of (ctl_days, atl_days), e.g. itertools.product(...).
+
+    Returns:
+        dict: "ctl", "atl" and "tsb" arrays of shape (len(pairs), len(loads)).
+    """
+    pairs = np.asarray(list(pairs), dtype=float).reshape(-1, 2)
+    tcs, index = np.unique(pairs, return_inverse=True)
+    index = index.reshape(pairs.shape)
+
+    curves = ewma_batch(loads, tcs)
+    ctl = curves[index[:, 0]]
+    atl = curves[index[:, 1]]
+
+    return {"ctl": ctl, "atl": atl, "tsb": ctl - atl}
+
+
+@metrics.timed()
+def fit_banister(df_load, df_perf, ctl_range=FIT_CTL_DAYS, atl_range=FIT_ATL_DAYS):
+    """
+    Fit the Banister impulse-response model to an athlete's performances.
+
+        performance(t) = baseline + fitness_gain * CTL(t-1) - fatigue_gain * ATL(t-1)
+
+    by least squares, over every integer pair of CTL days in ctl_range and ATL
+    days in atl_range (CTL days > ATL days, both gains positive). Each time
+    constant is filtered once with ewma_batch; for a given pair the gains
+    then follow from a 2x2 linear system of centered sums. Those systems are
+    solved for the whole grid at once with array arithmetic, the CTL/ATL
+    cross terms being a single matrix product.
+
+    Args:
+        df_load: daily loads, as from get_daily_load (one row per day).
+        df_perf: "date" and "speed_mps" of each performance, as from
+            get_race_pace_history. Several per day are fine.
+
+    Returns:
+        dict: ctl_days, atl_days, fitness_gain, fatigue_gain, baseline, rmse,
+        r2 and performances (the number fitted), or None if there are fewer
+        than FIT_MIN_PERFORMANCES or no pair fits with positive gains.
+    """
+    loads = df_load["load"].to_numpy(dtype=float)
+    start = np.datetime64(df_load["date"].iloc[0], "D") if len(df_load) else None
+    df_perf = pd.DataFrame(df_perf)
+    if start is None or df_perf.empty:
+        return None
+
+    # Performances are explained by the loads up to the day before
+    days = (pd.to_datetime(df_perf["date"]).to_numpy().astype("datetime64[D]") - start).astype(int) - 1
+    in_range = (days >= 0) & (days < len(loads))
+    days = days[in_range]
+    perf = df_perf["speed_mps"].to_numpy(dtype=float)[in_range]
+    metrics.add(days=len(loads), performances=len(perf))
+    if len(perf) < FIT_MIN_PERFORMANCES:
+        return None
+
+    ctl_tcs = np.arange(ctl_range[0], ctl_range[1] + 1)
+    atl_tcs = np.arange(atl_range[0], atl_range[1] + 1)
+    tcs = np.union1d(ctl_tcs, atl_tcs)
+    sampled = ewma_batch(loads, tcs)[:, days]
+    sampled = sampled - sampled.mean(axis=1, keepdims=True)
+    fitness = sampled[np.searchsorted(tcs, ctl_tcs)]   # (n_ctl, n_perf)
+    fatigue = sampled[np.searchsorted(tcs, atl_tcs)]   # (n_atl, n_perf)
+    perf_centered = perf - perf.mean()
+
+    # Normal equations of perf ~ b * fitness + c * fatigue for every pair
+    s_ff = np.sum(fitness ** 2, axis=1)[:, None]
+    s_gg = np.sum(fatigue ** 2, axis=1)[None, :]
+    s_fg = fitness @ fatigue.T
+    s_fp = (fitness @ perf_centered)[:, None]
+    s_gp = (fatigue @ perf_centered)[None, :]
+    s_pp = float(perf_centered @ perf_centered)
+    metrics.add(pairs=s_fg.size)
+
+    det = s_ff * s_gg - s_fg ** 2
+    with np.errstate(divide="ignore", invalid="ignore"):
+        b = (s_gg * s_fp - s_fg * s_gp) / det
+        c = (s_ff * s_gp - s_fg * s_fp) / det
+    sse = s_pp - b * s_fp - c * s_gp
+
+    valid = (det > 1e-12 * s_ff * s_gg) & (b > 0) & (c < 0) & (ctl_tcs[:, None] > atl_tcs[None, :])
+    if not valid.any():
+        return None
+    i, j = np.unravel_index(np.argmin(np.where(valid, sse, np.inf)), sse.shape)
+
+    fitness_gain, fatigue_gain = float(b[i, j]), float(-c[i, j])
+    ctl = ewma_batch(loads, [ctl_tcs[i]])[0][days]
+    atl = ewma_batch(loads, [atl_tcs[j]])[0][days]
+    baseline = float(perf.mean() - fitness_gain * ctl.mean() + fatigue_gain * atl.mean())
+    residual_ss = max(float(sse[i, j]), 0.0)
+    return {
+        "ctl_days": int(ctl_tcs[i]),
+        "atl_days": int(atl_tcs[j]),
+        "fitness_gain": fitness_gain,
+        "fatigue_gain": fatigue_gain,
+        "baseline": baseline,
+        "rmse": float(np.sqrt(residual_ss / len(perf))),
+        "r2": 1 - residual_ss / s_pp if s_pp > 0 else 0.0,
+        "performances": int(len(perf)),
+    }
@@ -0,0 +1,193 @@
+import os
+from pathlib import Path
+
+import numpy as np
+
+import metrics
+
+# Summed per day and sport type
+MEASURES = ("load", "moving_time", "distance")
+
+# Period lengths the cube is rolled up to
+RESOLUTIONS = ("day", "week", "month", "year")
+
+# Arrays kept per activity, to find the days an update touches
+RECORD_FIELDS = ("file", "day", "sport", "values", "sports")
+
+# Bump when the stored arrays change
+ROLLUP_VERSION = 1
+
+
+def period_starts(days, resolution):
+    """First day of the period (Monday-based weeks, months, years) each day falls in."""
+    days = np.asarray(days).astype("datetime64[D]")
+    if resolution == "day":
+        return days
+    if resolution == "week":
+        # Day 0 of the epoch is a Thursday
+        since_epoch = days.astype(np.int64)
+        return ((since_epoch + 3) // 7 * 7 - 3).astype("datetime64[D]")
+    if resolution == "month":
+        return days.astype("datetime64[M]").astype("datetime64[D]")
+    if resolution == "year":
+        return days.astype("datetime64[Y]").astype("datetime64[D]")
+    raise ValueError(f"Unknown resolution {resolution!r}, expected one of {RESOLUTIONS}")
+
+
+class RollupCube:
+    """
+    MEASURES summed by day and sport type, with every coarser resolution of
+    RESOLUTIONS materialized.
+
+    daily has shape (days, sports, MEASURES) and covers every day from start
+    on, zeros included. The rollups are built with one np.add.reduceat per
+    resolution, so switching sport or resolution never regroups activities.
+    """
+
+    def __init__(self, start, sports, daily):
+        self.start = np.datetime64(start, "D")
+        self.sports = [str(sport) for sport in sports]
+        self.daily = np.asarray(daily, dtype=float)
+        self.days = self.start + np.arange(len(self.daily))
+
+        self.rollups = {"day": (self.days, self.daily)}
+        for resolution in RESOLUTIONS[1:]:
+            starts = period_starts(self.days, resolution)
+            first = np.flatnonzero(np.r_[True, starts[1:] != starts[:-1]]) if len(starts) else np.array([], dtype=int)
+            values = np.add.reduceat(self.daily, first, axis=0) if len(first) else self.daily[:0]
+            self.rollups[resolution] = (starts[first], values)
+
+    def series(self, measure="load", sport=None, resolution="day"):
+        """
+        Returns:
+            tuple: (period start days, totals) of one measure, for one sport
+            type or all of them (sport=None).
+        """
+        starts, values = self.rollups[resolution]
+        values = values[:, :, MEASURES.index(measure)]
+        if sport is None:
+            return starts, values.sum(axis=1)
+        if sport not in self.sports:
+            return starts, np.zeros(len(starts))
+        return starts, values[:, self.sports.index(sport)]
+
+
+def _records(files, dates, sports, values):
+    """Activity rows sorted by file, with sport types as indexes into sorted names."""
+    files = np.asarray(files, dtype=str)
+    order = np.argsort(files, kind="stable")
+    sport_names, sport = np.unique(np.asarray(sports, dtype=str), return_inverse=True)
+    return {
+        "file": files[order],
+        "day": np.asarray(dates).astype("datetime64[D]").astype(np.int64)[order],
+        "sport": sport.reshape(-1)[order],
+        "values": np.asarray(values, dtype=float).reshape(-1, len(MEASURES))[order],
+        "sports": sport_names,
+    }
+
+
+def _sum_days(daily, first_day, records, rows):
+    # np.add.at adds rows in order, so any subset of days sums like a full build
+    np.add.at(daily, (records["day"][rows] - first_day, records["sport"][rows]), records["values"][rows])
+
+
+def build_cube(files, dates, sports, values):
+    """
+    Cube of one row per activity.
+
+    Args:
+        files: name of each activity's file; rows are summed in file order.
+        dates: activity days.
+        sports: activity sport types.
+        values: (activities, MEASURES) array.
+
+    Returns:
+        tuple: (RollupCube, records) where records are the sorted activity
+        rows update_cube diffs against.
+    """
+    records = _records(files, dates, sports, values)
+    if len(records["file"]) == 0:
+        return RollupCube("1970-01-01", [], np.zeros((0, 0, len(MEASURES)))), records
+
+    first_day = records["day"].min()
+    daily = np.zeros((records["day"].max() - first_day + 1, len(records["sports"]), len(MEASURES)))
+    _sum_days(daily, first_day, records, slice(None))
+    metrics.add(days_summed=len(daily))
+    return RollupCube(np.datetime64(int(first_day), "D"), records["sports"], daily), records
+
+
+def update_cube(cube, old_records, files, dates, sports, values):
+    """
+    build_cube for the current activities, reusing a cube built from old_records.
+
+    Only the days holding an activity that was added, removed or changed are
+    summed again, from the activities on those days, so the result is
+    identical to a full build. Falls back to one when the sport types or the
+    first day change.
+
+    Returns:
+        tuple: (RollupCube, records), as from build_cube.
+    """
+    records = _records(files, dates, sports, values)
+    if (
+        cube is None
+        or len(records["file"]) == 0
+        or not np.array_equal(records["sports"], old_records["sports"])
+        or records["day"].min() != cube.start.astype(np.int64)
+    ):
+        return build_cube(files, dates, sports, values)
+
+    # Match every current file to its old row (both are sorted by file)
+    old_files = old_records["file"]
+    position = np.minimum(np.searchsorted(old_files, records["file"]), max(len(old_files) - 1, 0))
+    unchanged = old_files[position] == records["file"] if len(old_files) else np.zeros(len(position), dtype=bool)
+    at = position[unchanged]
+    unchanged[unchanged] = (
+        (old_records["day"][at] == records["day"][unchanged])
+        & (old_records["sport"][at] == records["sport"][unchanged])
+        & np.all(old_records["values"][at] == records["values"][unchanged], axis=1)
+    )
+    kept = np.zeros(len(old_files), dtype=bool)
+    kept[position[unchanged]] = True
+
+    changed_days = np.union1d(old_records["day"][~kept], records["day"][~unchanged])
+    if len(changed_days) == 0:
+        return cube, records
+
+    first_day = records["day"].min()
+    n_days = records["day"].max() - first_day + 1
+    daily = np.zeros((n_days, len(records["sports"]), len(MEASURES)))
+    overlap = min(n_days, len(cube.daily))
+    daily[:overlap] = cube.daily[:overlap]
+
+    changed_days = changed_days[changed_days - first_day < n_days]
+    daily[changed_days - first_day] = 0.0
+    _sum_days(daily, first_day, records, np.isin(records["day"], changed_days))
+    metrics.add(days_summed=len(changed_days))
+    return RollupCube(cube.start, records["sports"], daily), records
+
+
+def read_state(path):
+    """
+    Returns:
+        tuple: (RollupCube, records) stored by write_state, or (None, None).
+    """
+    try:
+        with np.load(path) as stored:
+            if stored["version"] != ROLLUP_VERSION:
+                return None, None
+            records = {key: stored[f"record_{key}"] for key in RECORD_FIELDS}
+            return RollupCube(stored["start"], records["sports"], stored["daily"]), records
+    except (OSError, ValueError, KeyError):
+        return None, None
+
+
+def write_state(path, cube, records):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp")
+    with open(tmp_path, "wb") as f:
+        # Prefixed, since np.savez takes "file" itself
+        arrays = {f"record_{key}": records[key] for key in RECORD_FIELDS}
+        np.savez(f, version=ROLLUP_VERSION, start=cube.start, daily=cube.daily, **arrays)
+    os.replace(tmp_path, path)
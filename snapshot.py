@@ -0,0 +1,118 @@
+import os
+from pathlib import Path
+
+import numpy as np
+
+import metrics
+from catalog import ACTIVITIES_DIR, INGEST_WORKERS, cache_path, manifest_digest, scan_activity_files
+from streams import scan_stream_files
+
+# Precomputed dashboard data so app.py can start without parsing the archive.
+# The ingest step stores daily load, default CTL/ATL and the race pace history
+# (which is also what pace predictions are computed from) as plain arrays in
+# one .npz. Bump the version when the stored arrays change.
+# The daily load, moving time and distance per sport type (rollup.RollupCube) ride
+# along, so per-sport and weekly/monthly/yearly views need no ingest either.
+SNAPSHOT_VERSION = 4
+
+# The same arrays, compressed and shipped next to app.py in the Shinylive build
+# (see bundle.py); the browser app reads only this file
+BUNDLE_PATH = Path(__file__).parent / "dashboard-data.npz"
+
+
+def snapshot_path(activities_dir=ACTIVITIES_DIR):
+    return cache_path(activities_dir, "snapshot", ".npz")
+
+
+def trends_state_path(activities_dir, sport=None):
+    """
+    CTL/ATL checkpoint (pmc.calculate_trends' state_path) of the default time
+    constants for one archive and sport. Only those are checkpointed, so there
+    is one file per sport however many slider positions get viewed.
+    """
+    return cache_path(activities_dir, "pmc" if sport is None else f"pmc-{sport}", ".npz")
+
+
+def source_digest(activities_dir=ACTIVITIES_DIR):
+    """
+    Fingerprint of the activity files a snapshot was built from: the summaries
+    and the streams files, which the pace history's best splits are read from.
+    """
+    if not os.path.exists(activities_dir):
+        return ""
+    return manifest_digest({**scan_activity_files(activities_dir), **scan_stream_files(activities_dir)})
+
+
+@metrics.timed()
+def write_snapshot(path=None, compressed=False, activities_dir=ACTIVITIES_DIR, workers=INGEST_WORKERS):
+    """
+    Ingest an activity archive and store everything the dashboard shows at startup.
+
+    Args:
+        path: where to write it, snapshot_path() by default.
+        compressed: zip-deflate the arrays, for files that get downloaded.
+        activities_dir: archive to ingest, ACTIVITIES_DIR by default.
+        workers: worker processes parsing new activity files (see load_catalog).
+
+    Returns:
+        Path: the snapshot file, or None if there is no activity data.
+    """
+    # Imported here: load_data calls write_snapshot from its __main__ block
+    import pmc
+    from load_data import get_daily_load, get_rollup
+    from performance import get_race_pace_history
+
+    digest = source_digest(activities_dir)
+    df_load = get_daily_load(workers, activities_dir=activities_dir)
+    if df_load is None:
+        return None
+
+    # Resumed from the last rebuild's checkpoint, so new days don't recompute history
+    state_path = trends_state_path(activities_dir)
+    trends = pmc.calculate_trends(df_load, state_path=state_path)
+    cube = get_rollup(activities_dir=activities_dir)
+    history = get_race_pace_history(activities_dir)
+
+    path = Path(snapshot_path(activities_dir) if path is None else path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp")
+    save = np.savez_compressed if compressed else np.savez
+    with open(tmp_path, "wb") as f:
+        save(
+            f,
+            version=SNAPSHOT_VERSION,
+            source=digest,
+            date=df_load["date"].to_numpy().astype("datetime64[D]"),
+            load=df_load["load"].to_numpy(dtype=float),
+            ctl_days=pmc.DEFAULT_CTL_DAYS,
+            atl_days=pmc.DEFAULT_ATL_DAYS,
+            ctl=trends["ctl"].to_numpy(),
+            atl=trends["atl"].to_numpy(),
+            pace_date=np.array([rec["date"] for rec in history], dtype="datetime64[D]"),
+            pace_speed=np.array([rec["speed_mps"] for rec in history], dtype=float),
+            rollup_start=cube.start,
+            sports=np.array(cube.sports, dtype=str),
+            by_sport=cube.daily,
+        )
+    os.replace(tmp_path, path)
+    return path
+
+
+def read_snapshot(path=None):
+    """
+    Returns:
+        dict: the stored arrays, or None if there's no usable snapshot.
+    """
+    path = snapshot_path() if path is None else path
+    try:
+        with np.load(path) as stored:
+            if stored["version"] != SNAPSHOT_VERSION:
+                return None
+            return {key: stored[key] for key in stored.files}
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+if __name__ == "__main__":
+    path = write_snapshot()
+    print(f"Snapshot written to {path}" if path else "No valid activity data found.")
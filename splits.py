@@ -0,0 +1,76 @@
+import numpy as np
+
+import metrics
+from streams import map_stream_files, read_streams
+
+# Standard race distances (m) searched for in every run's distance stream
+SPLIT_DISTANCES = {"1k": 1000.0, "5k": 5000.0, "10k": 10000.0, "half": 21097.5}
+
+
+def _time_reaching(distance, time_s, targets):
+    """Earliest time the (non-decreasing) distance stream reaches each target."""
+    j = np.clip(np.searchsorted(distance, targets, side="left"), 1, len(distance) - 1)
+    d0, d1 = distance[j - 1], distance[j]
+    frac = np.clip((targets - d0) / np.maximum(d1 - d0, 1e-9), 0.0, 1.0)
+    return time_s[j - 1] + frac * (time_s[j] - time_s[j - 1])
+
+
+def _time_leaving(distance, time_s, targets):
+    """Latest time the (non-decreasing) distance stream is still at each target."""
+    j = np.clip(np.searchsorted(distance, targets, side="right"), 1, len(distance) - 1)
+    d0, d1 = distance[j - 1], distance[j]
+    frac = np.clip((targets - d0) / np.maximum(d1 - d0, 1e-9), 0.0, 1.0)
+    return time_s[j - 1] + frac * (time_s[j] - time_s[j - 1])
+
+
+def best_split_time(time_s, distance, target):
+    """
+    Fastest time (s) to cover target metres in one contiguous stretch, NaN if the run is shorter.
+
+    Distance is interpolated linearly between samples, so the fastest stretch
+    starts or ends on a sample. Both families are scanned with one vectorized
+    binary search each: the end of the stretch starting at every sample, and
+    the start of the one ending at every sample.
+    """
+    time_s = np.asarray(time_s, dtype=float)
+    distance = np.asarray(distance, dtype=float)
+    valid = ~(np.isnan(time_s) | np.isnan(distance))
+    time_s = time_s[valid]
+    # GPS corrections can make the cumulative distance dip slightly
+    distance = np.maximum.accumulate(distance[valid]) if valid.any() else distance[valid]
+    if len(distance) < 2 or distance[-1] - distance[0] < target:
+        return np.nan
+
+    starts = distance <= distance[-1] - target
+    from_start = _time_reaching(distance, time_s, distance[starts] + target) - time_s[starts]
+    ends = distance >= distance[0] + target
+    to_end = time_s[ends] - _time_leaving(distance, time_s, distance[ends] - target)
+    return float(min(from_start.min(), to_end.min()))
+
+
+def best_split_times(time_s, distance):
+    """best_split_time for each of SPLIT_DISTANCES, in that order."""
+    return np.array([best_split_time(time_s, distance, target) for target in SPLIT_DISTANCES.values()])
+
+
+def stream_splits(filepath):
+    """Best split times of one activity from its streams file (all NaN without a distance stream)."""
+    streams = read_streams(filepath)
+    if "time" not in streams or "distance" not in streams:
+        return np.full(len(SPLIT_DISTANCES), np.nan)
+    return best_split_times(streams["time"], streams["distance"])
+
+
+@metrics.timed()
+def get_best_splits(activities_dir, activity_files):
+    """
+    Best split times for each activity file, computed once per stream file
+    (see streams.map_stream_files).
+
+    Returns:
+        np.ndarray: (len(activity_files), len(SPLIT_DISTANCES)) times in seconds,
+        NaN where there are no streams or the activity is too short.
+    """
+    return map_stream_files(
+        activities_dir, activity_files, "best-splits", stream_splits, shape=(len(SPLIT_DISTANCES),)
+    )
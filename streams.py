@@ -0,0 +1,229 @@
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+
+import archive
+import metrics
+from catalog import cache_path
+
+# Thresholds for stream-based load. They match the "solid effort" reference
+# points of load_data.calculate_load, so one hour at threshold scores 100.
+FTP_WATTS = 200
+THRESHOLD_HR = 140
+
+# Rolling window for Normalized Power, in seconds
+NP_WINDOW_SECONDS = 30
+
+# Longer gaps between samples are pauses (auto-pause, stops), which count
+# for nothing; shorter ones are smart-recording intervals and are filled in
+MAX_SAMPLE_GAP_SECONDS = 10
+
+# Bump when stream_load changes so cached loads are recomputed
+STREAM_LOAD_VERSION = 2
+
+
+def stream_filename(activity_filename):
+    """'123.json' -> '123_streams.json'"""
+    return activity_filename[:-len(".json")] + "_streams.json"
+
+
+def read_streams(filepath):
+    """
+    Load a Strava streams file as float arrays keyed by stream type.
+
+    Handles both the keyed form ({"watts": {"data": [...]}, ...}) and the
+    list form ([{"type": "watts", "data": [...]}, ...]). Nulls become NaN.
+    """
+    raw = json.loads(archive.read_text(filepath))
+
+    if isinstance(raw, dict):
+        items = raw.items()
+    else:
+        items = ((s.get("type"), s) for s in raw if isinstance(s, dict))
+
+    streams = {}
+    for name, stream in items:
+        data = stream.get("data") if isinstance(stream, dict) else stream
+        if name and isinstance(data, list):
+            streams[name] = np.asarray(data, dtype=float)
+    return streams
+
+
+def resample_1hz(time_s, values, max_gap=MAX_SAMPLE_GAP_SECONDS):
+    """
+    Linearly resample a stream onto a one-sample-per-second grid.
+
+    Seconds inside gaps longer than max_gap are left out rather than
+    interpolated, so a pause adds neither samples nor values.
+    """
+    if len(time_s) < 2:
+        return values
+    grid = np.arange(time_s[0], time_s[-1] + 1)
+    # Last sample at or before each second, and the gap that follows it
+    last = np.searchsorted(time_s, grid, side="right") - 1
+    gaps = np.diff(time_s, append=np.inf)
+    keep = (grid == time_s[last]) | (gaps[last] <= max_gap)
+    return np.interp(grid[keep], time_s, values)
+
+
+def sample_seconds(time_s, max_gap=MAX_SAMPLE_GAP_SECONDS):
+    """Seconds each sample stands for: up to the next one, or 1 before a pause and at the end."""
+    seconds = np.diff(time_s, append=time_s[-1] + 1)
+    seconds[seconds > max_gap] = 1
+    return seconds
+
+
+def normalized_power(watts):
+    """Normalized Power of a 1 Hz power series: 4th-power mean of the 30s rolling average."""
+    if len(watts) == 0:
+        return 0.0
+    if len(watts) < NP_WINDOW_SECONDS:
+        rolling = np.array([watts.mean()])
+    else:
+        csum = np.concatenate([[0.0], np.cumsum(watts)])
+        rolling = (csum[NP_WINDOW_SECONDS:] - csum[:-NP_WINDOW_SECONDS]) / NP_WINDOW_SECONDS
+    return float(np.mean(rolling ** 4) ** 0.25)
+
+
+def power_tss(watts):
+    """TSS = hours * IF^2 * 100, with IF = NP / FTP."""
+    intensity = normalized_power(watts) / FTP_WATTS
+    return len(watts) / 3600 * intensity ** 2 * 100
+
+
+def hr_tss(heartrate, seconds):
+    """Heart-rate TSS: each sample scores (HR / threshold HR)^2 per hour of its duration."""
+    return float(np.sum((heartrate / THRESHOLD_HR) ** 2 * seconds) / 3600 * 100)
+
+
+def stream_load(filepath):
+    """
+    Load of one activity from its per-second streams.
+
+    Uses power (NP-based TSS) when a watts stream is present, otherwise
+    heart rate (hrTSS over moving samples). Pauses longer than
+    MAX_SAMPLE_GAP_SECONDS don't count towards either.
+
+    Returns:
+        float: the load, or NaN if the streams hold neither power nor HR.
+    """
+    streams = read_streams(filepath)
+    time_s = streams.get("time")
+    moving = streams.get("moving")
+
+    watts = streams.get("watts")
+    if watts is not None and np.any(watts > 0):
+        # Dropouts count as zero power, as in the usual NP definition
+        watts = np.nan_to_num(watts)
+        if time_s is not None and len(time_s) == len(watts):
+            watts = resample_1hz(time_s, watts)
+        return power_tss(watts)
+
+    heartrate = streams.get("heartrate")
+    if heartrate is not None and np.any(heartrate > 0):
+        if time_s is not None and len(time_s) == len(heartrate):
+            seconds = sample_seconds(time_s)
+        else:
+            seconds = np.ones(len(heartrate))
+        keep = heartrate > 0
+        if moving is not None and len(moving) == len(heartrate):
+            keep &= moving > 0
+        return hr_tss(heartrate[keep], seconds[keep])
+
+    return float("nan")
+
+
+def _read_cache(path):
+    try:
+        with np.load(path) as cached:
+            return {
+                name: ((int(mtime), int(size)), value)
+                for name, mtime, size, value in zip(cached["name"], cached["mtime_ns"], cached["size"], cached["value"])
+            }
+    except (OSError, ValueError, KeyError):
+        return {}
+
+
+def _write_cache(path, entries):
+    names = sorted(entries)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp")
+    with open(tmp_path, "wb") as f:
+        np.savez(
+            f,
+            name=np.array(names, dtype=str),
+            mtime_ns=np.array([entries[n][0][0] for n in names], dtype=np.int64),
+            size=np.array([entries[n][0][1] for n in names], dtype=np.int64),
+            value=np.array([entries[n][1] for n in names], dtype=float),
+        )
+    os.replace(tmp_path, path)
+
+
+def scan_stream_files(activities_dir):
+    """Like catalog.scan_activity_files, for the *_streams.json files."""
+    return archive.scan(activities_dir, lambda name: name.endswith("_streams.json"))
+
+
+def map_stream_files(activities_dir, activity_files, cache_name, compute, shape=()):
+    """
+    Apply compute(path) to the streams file of each activity file, once per stream file.
+
+    Results are cached in a compact .npz under CACHE_DIR keyed on the stream
+    file's name, mtime and size, so only new or changed streams are read.
+
+    Args:
+        cache_name: name of the cache file.
+        compute: returns a float, or a float array of the given shape.
+        shape: shape of one result.
+
+    Returns:
+        np.ndarray: one result per activity file, NaN where no usable streams exist.
+    """
+    activities_dir = Path(activities_dir)
+    path = cache_path(activities_dir, cache_name, ".npz")
+    cached = _read_cache(path)
+    current = scan_stream_files(activities_dir)
+
+    entries = {}
+    changed = False
+    values = np.full((len(activity_files),) + shape, np.nan)
+    for i, activity_file in enumerate(activity_files):
+        name = stream_filename(activity_file)
+        stat = current.get(name)
+        if stat is None:
+            continue
+
+        hit = cached.get(name)
+        if hit is not None and hit[0] == stat and np.shape(hit[1]) == shape:
+            value = hit[1]
+        else:
+            metrics.add(files_parsed=1, bytes_read=stat[1])
+            try:
+                value = compute(activities_dir / name)
+            except Exception as e:
+                print(f"Error processing {name}: {e}")
+                metrics.add(parse_errors=1)
+                continue
+            changed = True
+
+        entries[name] = (stat, value)
+        values[i] = value
+
+    if changed or len(entries) != len(cached):
+        _write_cache(path, entries)
+
+    return values
+
+
+@metrics.timed()
+def get_stream_loads(activities_dir, activity_files):
+    """
+    Stream-based load for each activity file, computed once per stream file
+    (see map_stream_files).
+
+    Returns:
+        np.ndarray: one load per activity file, NaN where no usable streams exist.
+    """
+    return map_stream_files(activities_dir, activity_files, f"stream-loads-v{STREAM_LOAD_VERSION}", stream_load)
@@ -0,0 +1,61 @@
+import zipfile
+
+import numpy as np
+import pytest
+
+import archive
+import catalog
+from benchmarks.synthetic import generate_archive
+from streams import get_stream_loads
+
+
+@pytest.fixture
+def archives(tmp_path, monkeypatch):
+    monkeypatch.setattr(catalog, "CACHE_DIR", tmp_path / "cache")
+    activities_dir = generate_archive(tmp_path / "activities", 60, seed=5, streams_fraction=0.3, detailed_fraction=0.3)
+    (activities_dir / "bad.json").write_text("{oops")
+    zip_path = tmp_path / "activities.zip"
+    archive.pack(activities_dir, zip_path)
+    return activities_dir, zip_path
+
+
+def test_zip_reads_like_the_directory(archives):
+    activities_dir, zip_path = archives
+    assert catalog.scan_activity_files(zip_path).keys() == catalog.scan_activity_files(activities_dir).keys()
+
+    frames = [catalog.load_catalog(d).sort_values("file", ignore_index=True) for d in (activities_dir, zip_path)]
+    assert len(frames[0]) == 60
+    assert frames[0].equals(frames[1])
+
+    files = frames[0]["file"].tolist()
+    assert np.array_equal(get_stream_loads(activities_dir, files), get_stream_loads(zip_path, files), equal_nan=True)
+
+
+def test_member_reads(archives):
+    activities_dir, zip_path = archives
+    name = sorted(catalog.scan_activity_files(activities_dir))[0]
+    expected = (activities_dir / name).read_text()
+    assert archive.read_text(zip_path / name) == expected
+    assert archive.reader(zip_path)(name) == expected
+    with pytest.raises(FileNotFoundError):
+        archive.reader(zip_path)("missing.json")
+
+
+def test_repacked_zip_is_rescanned(archives):
+    activities_dir, zip_path = archives
+    before = catalog.scan_activity_files(zip_path)
+    (activities_dir / "bad.json").write_text('{"start_date": "2024-01-01T00:00:00Z"}')
+    archive.pack(activities_dir, zip_path, compresslevel=1)
+    after = catalog.scan_activity_files(zip_path)
+    assert after["bad.json"] != before["bad.json"]
+    assert catalog.load_catalog(zip_path)["file"].isin(["bad.json"]).any()
+
+
+def test_stored_and_other_members(tmp_path):
+    zip_path = tmp_path / "mixed.zip"
+    with zipfile.ZipFile(zip_path, "w") as zf:
+        zf.writestr("stored.json", "{}", compress_type=zipfile.ZIP_STORED)
+        zf.writestr("bzip.json", "[1]", compress_type=zipfile.ZIP_BZIP2)
+    read = archive.reader(zip_path)
+    assert read("stored.json") == "{}"
+    assert read("bzip.json") == "[1]"
@@ -0,0 +1,43 @@
+import numpy as np
+
+from best_efforts import BestEffortIndex
+
+
+def make_runs(n, seed=0):
+    rng = np.random.default_rng(seed)
+    dates = np.datetime64("2020-01-01") + rng.integers(0, 1000, n).astype("timedelta64[D]")
+    return dates, rng.uniform(2.0, 5.0, n)
+
+
+def test_best_in_window_matches_scan():
+    dates, speeds = make_runs(700)
+    index = BestEffortIndex(dates, speeds)
+    rng = np.random.default_rng(1)
+    for _ in range(500):
+        start = np.datetime64("2019-12-01") + np.timedelta64(int(rng.integers(0, 1100)), "D")
+        end = start + np.timedelta64(int(rng.integers(-3, 200)), "D")
+        in_window = (dates >= start) & (dates <= end)
+        expected = speeds[in_window].max() if in_window.any() else 0.0
+        assert index.best_in_window(start, end) == expected
+
+
+def test_rolling_best_matches_scan():
+    dates, speeds = make_runs(300, seed=2)
+    index = BestEffortIndex(dates, speeds)
+    days, best = index.rolling_best(30, start="2020-02-01", end="2023-06-01")
+
+    assert days[0] == np.datetime64("2020-02-01")
+    assert days[-1] == np.datetime64("2023-06-01")
+    for day, value in zip(days, best):
+        in_window = (dates > day - np.timedelta64(30, "D")) & (dates <= day)
+        if in_window.any():
+            assert value == speeds[in_window].max()
+        else:
+            assert np.isnan(value)
+
+
+def test_empty_index():
+    index = BestEffortIndex([], [])
+    assert index.best_in_window("2020-01-01", "2021-01-01") == 0.0
+    days, best = index.rolling_best(90)
+    assert len(days) == 0 and len(best) == 0
@@ -0,0 +1,117 @@
+import json
+import os
+import shutil
+
+import pytest
+
+import catalog
+import snapshot
+from benchmarks.synthetic import generate_archive
+
+
+@pytest.fixture
+def activities_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(catalog, "CACHE_DIR", tmp_path / "cache")
+    monkeypatch.setattr(catalog, "_catalogs", {})
+    return generate_archive(tmp_path / "activities", 30, seed=7, streams_fraction=0.0)
+
+
+@pytest.fixture
+def parsed(monkeypatch):
+    """Names of the files each parse_files call was given."""
+    calls = []
+    parse_files = catalog.parse_files
+
+    def recording(activities_dir, filenames):
+        calls.append(sorted(filenames))
+        return parse_files(activities_dir, filenames)
+
+    monkeypatch.setattr(catalog, "parse_files", recording)
+    return calls
+
+
+def rewrite(path, **changes):
+    activity = json.loads(path.read_text())
+    activity.update(changes)
+    path.write_text(json.dumps(activity))
+    # Make the change visible even on coarse mtime clocks
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+
+def reload(activities_dir, monkeypatch):
+    """The catalog as a new process would load it, from the persisted copy."""
+    monkeypatch.setattr(catalog, "_catalogs", {})
+    return catalog.load_catalog(activities_dir).set_index("file")
+
+
+def test_only_added_changed_and_removed_files_are_touched(activities_dir, parsed, monkeypatch):
+    first = catalog.load_catalog(activities_dir).set_index("file")
+    assert len(first) == 30 and len(parsed[0]) == 30
+    assert (first.dtypes[catalog.NUMERIC_COLUMNS] == "float64").all()
+
+    files = sorted(first.index)
+    added, changed, removed = "2000000000.json", files[0], files[1]
+    shutil.copy(activities_dir / files[2], activities_dir / added)
+    rewrite(activities_dir / changed, distance=12345.0)
+    (activities_dir / removed).unlink()
+
+    second = reload(activities_dir, monkeypatch)
+    assert parsed[1] == sorted([added, changed])
+    assert removed not in second.index and len(second) == 30
+    assert second.loc[changed, "distance"] == 12345.0
+    assert second.loc[added].equals(second.loc[files[2]])
+    assert second.drop([added, changed]).equals(first.drop([removed, changed]))
+    assert (second.dtypes[catalog.NUMERIC_COLUMNS] == "float64").all()
+
+    # Nothing changed: the persisted manifest means nothing is parsed
+    reload(activities_dir, monkeypatch)
+    assert len(parsed) == 2
+
+
+def test_failed_parse_is_retried(activities_dir, parsed, monkeypatch, capsys):
+    (activities_dir / "bad.json").write_text("{oops")
+    assert "bad.json" not in catalog.load_catalog(activities_dir)["file"].tolist()
+    assert "Error processing bad.json" in capsys.readouterr().out
+
+    # Still unreadable: tried again, and only it
+    reload(activities_dir, monkeypatch)
+    assert parsed[-1] == ["bad.json"]
+
+    (activities_dir / "bad.json").write_text('{"start_date": "2024-01-01T08:00:00Z", "type": "Run", "distance": 5000}')
+    fixed = reload(activities_dir, monkeypatch)
+    assert parsed[-1] == ["bad.json"]
+    assert fixed.loc["bad.json", "distance"] == 5000.0 and len(fixed) == 31
+
+
+def test_catalog_version_change_rebuilds(activities_dir, parsed, monkeypatch):
+    catalog.load_catalog(activities_dir)
+    monkeypatch.setattr(catalog, "CATALOG_VERSION", catalog.CATALOG_VERSION + 1)
+    assert len(reload(activities_dir, monkeypatch)) == 30
+    assert len(parsed[-1]) == 30
+
+
+def test_parallel_ingest_matches_serial(tmp_path, monkeypatch):
+    # More files than one chunk, so the pool splits them
+    activities_dir = generate_archive(tmp_path / "activities", catalog.CHUNK_SIZE + 60, seed=8, streams_fraction=0.0)
+    (activities_dir / "bad.json").write_text("{oops")
+    frames = []
+    for workers in (1, 2):
+        monkeypatch.setattr(catalog, "CACHE_DIR", tmp_path / f"cache-{workers}")
+        monkeypatch.setattr(catalog, "_catalogs", {})
+        frames.append(catalog.load_catalog(activities_dir, workers=workers))
+    assert len(frames[0]) == catalog.CHUNK_SIZE + 60
+    assert frames[0].equals(frames[1])
+
+
+def test_snapshot_passes_workers_to_the_ingest(activities_dir, monkeypatch, tmp_path):
+    used = []
+    load_catalog = catalog.load_catalog
+
+    def recording(activities_dir, workers=None):
+        used.append(workers)
+        return load_catalog(activities_dir, workers)
+
+    monkeypatch.setattr("load_data.load_catalog", recording)
+    snapshot.write_snapshot(tmp_path / "snapshot.npz", activities_dir=activities_dir, workers=3)
+    assert used[0] == 3
@@ -0,0 +1,86 @@
+import numpy as np
+import pytest
+
+from downsample import downsample, lttb, visible_slice
+
+
+def reference_lttb(x, y, threshold):
+    """Steinarsson's original loop, one bucket at a time."""
+    n = len(x)
+    every = (n - 2) / (threshold - 2)
+    a = 0
+    selected = [0]
+    for i in range(threshold - 2):
+        avg_start = int((i + 1) * every) + 1
+        avg_end = min(int((i + 2) * every) + 1, n)
+        avg_x = sum(x[avg_start:avg_end]) / (avg_end - avg_start)
+        avg_y = sum(y[avg_start:avg_end]) / (avg_end - avg_start)
+
+        max_area = -1.0
+        for j in range(int(i * every) + 1, int((i + 1) * every) + 1):
+            area = abs((x[a] - avg_x) * (y[j] - y[a]) - (x[a] - x[j]) * (avg_y - y[a])) / 2
+            if area > max_area:
+                max_area, best = area, j
+        selected.append(best)
+        a = best
+    selected.append(n - 1)
+    return selected
+
+
+def test_keeps_endpoints_and_threshold():
+    y = np.random.default_rng(0).normal(size=500)
+    keep = lttb(np.arange(500), y, 50)
+    assert len(keep) == 50
+    assert keep[0] == 0 and keep[-1] == 499
+    assert (np.diff(keep) > 0).all()
+
+
+@pytest.mark.parametrize("n, threshold", [(20, 5), (97, 13), (300, 100), (1000, 3)])
+def test_matches_reference(n, threshold):
+    rng = np.random.default_rng(n)
+    x = np.cumsum(rng.uniform(0.5, 1.5, n))
+    y = rng.normal(size=n).cumsum()
+    assert lttb(x, y, threshold).tolist() == reference_lttb(x.tolist(), y.tolist(), threshold)
+
+
+def test_fixed_series():
+    y = np.array([0, 1, 0, 0, 5, 0, 0, -3, 0, 0, 1, 0], dtype=float)
+    # Bucket 1..3 against the average of 4..6: index 3 spans the largest triangle
+    assert lttb(np.arange(12), y, 5).tolist() == [0, 3, 4, 7, 11]
+
+
+def test_short_input_is_unchanged():
+    x = np.arange(np.datetime64("2024-01-01"), np.datetime64("2024-01-11"))
+    y = np.arange(10.0)
+    assert lttb(x, y, 10).tolist() == list(range(10))
+    assert lttb(x, y, 2).tolist() == list(range(10))
+    out_x, out_y = downsample(x, y, n_out=50)
+    assert np.array_equal(out_x, x) and np.array_equal(out_y, y)
+
+
+def test_dates_pick_the_same_points_as_numbers():
+    y = np.random.default_rng(1).normal(size=400)
+    days = np.arange(np.datetime64("2020-01-01"), np.datetime64("2020-01-01") + np.timedelta64(400, "D"))
+    assert np.array_equal(lttb(days, y, 40), lttb(np.arange(400), y, 40))
+
+
+def test_visible_slice_adds_one_point_either_side():
+    x = np.arange(100)
+    assert visible_slice(x, None) == slice(0, 100)
+    assert visible_slice(x, (10, 20)) == slice(9, 22)
+    assert visible_slice(x, (-5, 3)) == slice(0, 5)
+    assert visible_slice(x, (95, 200)) == slice(94, 100)
+    assert visible_slice(x, (10.5, 10.7)) == slice(10, 12)
+
+
+def test_downsample_window():
+    x = np.arange(10000)
+    y = np.sin(x / 50.0)
+    out_x, out_y = downsample(x, y, (2000, 7000), n_out=300)
+    assert len(out_x) == 300
+    assert out_x[0] == 1999 and out_x[-1] == 7001
+    assert np.array_equal(out_y, y[out_x])
+
+    # A narrow window comes back at full resolution
+    out_x, _ = downsample(x, y, (100, 150), n_out=300)
+    assert out_x.tolist() == list(range(99, 152))
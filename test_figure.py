@@ -0,0 +1,48 @@
+import numpy as np
+
+import figure
+
+DAYS = np.arange(np.datetime64("2020-01-01"), np.datetime64("2020-03-01")).astype("datetime64[s]")
+
+
+def decoded_x(props):
+    """The dates plotly.js places the points at."""
+    if props["x"] is not None:
+        return np.array(props["x"], dtype="datetime64[ms]")
+    step = np.timedelta64(int(props["dx"]), "ms")
+    return np.datetime64(props["x0"], "ms") + step * np.arange(len(props["y"]))
+
+
+def test_regular_dates_become_x0_dx():
+    weeks = DAYS[::7]
+    for x in (DAYS, weeks, DAYS[:2]):
+        props = figure.encode_trace(x, np.arange(len(x)))
+        assert props["x"] is None and props["y"].dtype == np.float64
+        assert np.array_equal(decoded_x(props), x)
+
+
+def test_irregular_dates_are_sent_as_strings():
+    x = DAYS[[0, 3, 4, 10]]
+    props = figure.encode_trace(x, np.ones(4))
+    assert list(props["x"]) == ["2020-01-01", "2020-01-04", "2020-01-05", "2020-01-11"]
+    assert props["x0"] is None and props["dx"] is None
+    assert figure.encoded_bytes(props) == 4 * 8 + 4 * 13
+
+    # Times of day are kept
+    x = x + np.timedelta64(90, "m")
+    assert np.array_equal(decoded_x(figure.encode_trace(x, np.ones(4))), x)
+    assert len(figure.encode_trace(x[:0], np.ones(0))["x"]) == 0
+
+
+def test_patch_traces_switches_between_encodings():
+    widget = figure.new_widget()
+    sent = [None] * len(widget.data)
+    points = [(DAYS, np.ones(len(DAYS)))] * len(widget.data)
+    assert figure.patch_traces(widget, points, sent) == len(widget.data) * len(DAYS) * 8
+    assert widget.data[0].x is None and widget.data[0].x0 == "2020-01-01"
+    assert figure.patch_traces(widget, points, sent) == 0
+
+    points[0] = (DAYS[[0, 2, 3]], np.ones(3))
+    figure.patch_traces(widget, points, sent)
+    assert tuple(widget.data[0].x) == ("2020-01-01", "2020-01-03", "2020-01-04")
+    assert widget.data[0].x0 is None and widget.data[0].dx is None
@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import load_data
+from benchmarks.synthetic import generate_archive
+from load_data import DailyTotals, get_daily_load
+
+
+def grouped(dates, values):
+    """Gap-filled daily sums the pandas way."""
+    daily = pd.Series(values, index=pd.to_datetime(dates)).groupby(level=0).sum()
+    return daily.reindex(pd.date_range(daily.index.min(), daily.index.max()), fill_value=0)
+
+
+def test_totals_grow_both_ways():
+    rng = np.random.default_rng(0)
+    dates = np.datetime64("2020-01-01") + rng.integers(-2000, 2000, 5000)
+    values = rng.gamma(2.0, 30.0, 5000)
+
+    # Chunks reaching past either end of the array, then some inside it
+    totals = DailyTotals(capacity=8)
+    for rows in np.array_split(np.argsort(np.abs(dates - np.datetime64("2020-01-01"))), 20):
+        totals.add(dates[rows], values[rows])
+
+    days, sums = totals.series()
+    expected = grouped(dates, values)
+    assert np.array_equal(days, expected.index.to_numpy().astype("datetime64[D]"))
+    assert sums == pytest.approx(expected.to_numpy())
+
+
+def test_empty_totals():
+    totals = DailyTotals()
+    totals.add(np.array([], dtype="datetime64[D]"), np.zeros(0))
+    days, sums = totals.series()
+    assert len(days) == 0 and len(sums) == 0
+
+
+def test_daily_load_is_the_same_in_chunks(tmp_path, monkeypatch):
+    monkeypatch.setattr("catalog.CACHE_DIR", tmp_path / "cache")
+    out_dir = generate_archive(tmp_path / "acts", 300, seed=6, streams_fraction=0.0)
+    whole = get_daily_load(activities_dir=out_dir)
+
+    monkeypatch.setattr(load_data, "AGGREGATE_CHUNK", 7)
+    chunked = get_daily_load(activities_dir=out_dir)
+    assert chunked["date"].equals(whole["date"])
+    assert chunked["load"].to_numpy() == pytest.approx(whole["load"].to_numpy())
+    assert whole["date"].diff().dropna().eq(pd.Timedelta(days=1)).all()
@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+
+from best_efforts import BestEffortIndex
+from memo import SharedCache, approx_size
+from rollup import MEASURES, RollupCube
+
+
+def test_hits_and_misses_are_counted():
+    cache = SharedCache()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return np.arange(10)
+
+    for _ in range(3):
+        assert np.array_equal(cache.get(("trends", "default", "v1", 42, 7), compute), np.arange(10))
+    cache.get(("trends", "default", "v2", 42, 7), compute)
+
+    assert len(calls) == 2
+    assert cache.stats()["hits"] == 2
+    assert cache.stats()["misses"] == 2
+
+
+def test_least_recently_used_is_evicted_first():
+    cache = SharedCache(max_bytes=3 * 8000)
+    for key in "abc":
+        cache.get(key, lambda: np.zeros(1000))
+    cache.get("a", lambda: None)  # hit: "b" is now the oldest
+    cache.get("d", lambda: np.zeros(1000))
+
+    stats = cache.stats()
+    assert stats["evictions"] == 1
+    assert stats["entries"] == 3
+    assert stats["bytes"] <= cache.max_bytes
+    hits = stats["hits"]
+    cache.get("a", lambda: None)
+    assert cache.stats()["hits"] == hits + 1
+    assert cache.get("b", lambda: "recomputed") == "recomputed"
+
+
+def test_oversized_results_are_not_kept():
+    cache = SharedCache(max_bytes=1000)
+    cache.get("small", lambda: np.zeros(10))
+    cache.get("big", lambda: np.zeros(1000))
+    assert cache.stats()["entries"] == 1
+
+
+def test_approx_size_counts_frames():
+    df = pd.DataFrame({"date": pd.date_range("2020-01-01", periods=1000), "load": np.zeros(1000)})
+    assert approx_size(df) >= 16000
+
+
+def test_approx_size_counts_arrays_inside_objects():
+    daily = np.ones((4000, 5, len(MEASURES)))
+    cube = RollupCube("2015-01-01", ["Ride", "Run", "Swim", "Walk", "Hike"], daily)
+    cube.series("load", resolution="week")
+    # The daily array is referenced twice but counted once
+    assert daily.nbytes + cube.days.nbytes <= approx_size(cube) < 1.5 * daily.nbytes
+
+    dates = np.arange(np.datetime64("2020-01-01"), np.datetime64("2020-01-01") + np.timedelta64(2000, "D"))
+    index = BestEffortIndex(dates, np.linspace(3.0, 4.0, 2000))
+    assert approx_size(index) >= dates.nbytes + 2000 * 8
@@ -0,0 +1,42 @@
+import metrics
+
+
+@metrics.timed()
+def parse(n):
+    metrics.add(files_parsed=n, bytes_read=100 * n)
+    return n
+
+
+def test_spans_record_durations_and_counters(monkeypatch):
+    monkeypatch.setattr(metrics, "ENABLED", True)
+    metrics.reset()
+    parse(3)
+    parse(4)
+
+    total = metrics.summary()["parse"]
+    assert total["calls"] == 2
+    assert total["counters"] == {"files_parsed": 7, "bytes_read": 700}
+    assert total["max_ms"] >= total["mean_ms"] >= 0
+    assert [event["files_parsed"] for event in metrics.recent()] == [3, 4]
+
+
+def test_counters_go_to_innermost_span(monkeypatch):
+    monkeypatch.setattr(metrics, "ENABLED", True)
+    metrics.reset()
+    with metrics.span("outer"):
+        metrics.add(days=10)
+        parse(2)
+
+    summary = metrics.summary()
+    assert summary["outer"]["counters"] == {"days": 10}
+    assert summary["parse"]["counters"]["files_parsed"] == 2
+
+
+def test_disabled_hooks_record_nothing(monkeypatch):
+    monkeypatch.setattr(metrics, "ENABLED", False)
+    metrics.reset()
+    assert parse(5) == 5
+    with metrics.span("outer"):
+        metrics.add(days=1)
+    assert metrics.summary() == {}
+    assert metrics.recent() == []
@@ -0,0 +1,57 @@
+import json
+
+import numpy as np
+import pytest
+
+import catalog
+from benchmarks.synthetic import generate_archive
+from partial_json import extract_top_level
+
+KEYS = catalog.RECORD_KEYS
+
+
+def subset(document):
+    return {key: document[key] for key in KEYS if key in document}
+
+
+def test_matches_json_loads_on_synthetic_activities(tmp_path):
+    out_dir = generate_archive(tmp_path, 80, seed=4, streams_fraction=0.0, detailed_fraction=0.5)
+    for path in out_dir.iterdir():
+        text = path.read_text()
+        assert extract_top_level(text, KEYS) == subset(json.loads(text))
+
+
+def test_only_top_level_keys_count():
+    # Nested members with the wanted names must not be picked up
+    document = {
+        "start_date": "2024-01-01T00:00:00Z",
+        "laps": [{"average_watts": 300.0, "distance": 1.0}],
+        "map": {"type": "nested"},
+        "distance": 5000.0,
+        "type": "Run",
+    }
+    text = json.dumps(document, indent=2)
+    assert extract_top_level(text, KEYS) == subset(document)
+    assert extract_top_level("{}", KEYS) == {}
+
+
+def test_stops_before_unneeded_members():
+    # Everything after the last wanted key is left undecoded, even if invalid
+    text = '{"type": "Run", "distance": 1.5, "segment_efforts": [not json]}'
+    assert extract_top_level(text, ["type", "distance"]) == {"type": "Run", "distance": 1.5}
+
+
+@pytest.mark.parametrize("text", ['[{"type": "Run"}]', '{"type": "Run", "distance": 1', '{"ty\\u0070e": "Run"}', ""])
+def test_unusual_text_raises(text):
+    with pytest.raises(ValueError):
+        extract_top_level(text, KEYS)
+
+
+def test_decode_activity_falls_back_to_json_loads(monkeypatch):
+    monkeypatch.setattr(catalog, "PARTIAL_PARSE_MIN_BYTES", 0)
+    text = json.dumps([{"start_date": "2024-01-01"}])
+    assert catalog.decode_activity(text) == json.loads(text)
+
+    padded = json.dumps({"start_date": "2024-01-01T00:00:00Z", "map": {"polyline": "x" * 10000}, "type": "Ride"})
+    assert catalog.decode_activity(padded) == {"start_date": "2024-01-01T00:00:00Z", "type": "Ride"}
+    assert np.isnan(catalog.extract_record(catalog.decode_activity(padded))[5])
@@ -0,0 +1,166 @@
+import json
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import pmc
+import snapshot
+from benchmarks.synthetic import generate_archive
+
+
+def make_load(n_days, start="2020-01-01", seed=0):
+    rng = np.random.default_rng(seed)
+    loads = rng.uniform(0, 150, n_days) * (rng.random(n_days) < 0.7)
+    return pd.DataFrame({"date": pd.date_range(start, periods=n_days), "load": loads})
+
+
+def assert_same_trends(a, b):
+    for column in ["ctl", "atl", "tsb", "ramp"]:
+        assert np.array_equal(a[column].to_numpy(), b[column].to_numpy()), column
+
+
+def test_ewma_batch_matches_recurrence():
+    loads = make_load(500)["load"].to_numpy()
+    for tc in [1, 7, 42]:
+        alpha = np.exp(-1.0 / tc)
+        expected = []
+        value = 0.0
+        for load in loads:
+            value = value * alpha + load * (1 - alpha)
+            expected.append(value)
+        assert np.allclose(pmc.ewma_batch(loads, [tc])[0], expected, rtol=1e-12, atol=1e-9)
+
+
+def test_pmc_sweep_matches_single_runs():
+    df = make_load(400)
+    pairs = [(42, 7), (28, 5), (42, 5)]
+    sweep = pmc.pmc_sweep(df["load"], pairs)
+    assert sweep["tsb"].shape == (3, 400)
+    for i, (ctl_days, atl_days) in enumerate(pairs):
+        trends = pmc.calculate_trends(df, ctl_days, atl_days)
+        assert np.array_equal(sweep["tsb"][i], trends["tsb"].to_numpy())
+
+
+def test_incremental_append_matches_full_recompute(tmp_path):
+    state_path = tmp_path / "pmc.npz"
+    df = make_load(1000)
+
+    pmc.calculate_trends(df.iloc[:900], state_path=state_path)
+    incremental = pmc.calculate_trends(df, state_path=state_path)
+
+    assert_same_trends(incremental, pmc.calculate_trends(df))
+
+
+def test_incremental_change_matches_full_recompute(tmp_path):
+    state_path = tmp_path / "pmc.npz"
+    df = make_load(1000)
+    pmc.calculate_trends(df, state_path=state_path)
+
+    changed = df.copy()
+    changed.loc[777, "load"] += 60.0
+    incremental = pmc.calculate_trends(changed, state_path=state_path)
+
+    assert_same_trends(incremental, pmc.calculate_trends(changed))
+    # Days before the change keep their checkpointed values
+    assert np.array_equal(incremental["ctl"].to_numpy()[:777], pmc.calculate_trends(df)["ctl"].to_numpy()[:777])
+
+
+def test_new_start_date_or_parameters_recompute(tmp_path):
+    state_path = tmp_path / "pmc.npz"
+    df = make_load(300)
+    pmc.calculate_trends(df, state_path=state_path)
+
+    earlier = make_load(310, start="2019-12-22")
+    assert_same_trends(pmc.calculate_trends(earlier, state_path=state_path), pmc.calculate_trends(earlier))
+
+    assert_same_trends(
+        pmc.calculate_trends(earlier, 28, 5, state_path=state_path),
+        pmc.calculate_trends(earlier, 28, 5),
+    )
+
+
+def test_input_frame_is_left_alone():
+    df = make_load(100)
+    before = df.copy()
+    trends = pmc.calculate_trends(df)
+    pmc.trends_frame(df, trends["ctl"].to_numpy(), trends["atl"].to_numpy())
+    assert df.equals(before) and list(df.columns) == ["date", "load"]
+
+
+def test_snapshot_rebuild_resumes_from_checkpoint(tmp_path, monkeypatch):
+    monkeypatch.setattr("catalog.CACHE_DIR", tmp_path / "cache")
+    activities_dir = generate_archive(tmp_path / "acts", 200, seed=4, streams_fraction=0.0)
+    snapshot.write_snapshot(tmp_path / "before.npz", activities_dir=activities_dir)
+
+    # A new activity the day after the last one
+    activity = json.loads(max(activities_dir.glob("*.json")).read_text())
+    start = datetime.fromisoformat(activity["start_date"].replace("Z", "+00:00")) + timedelta(days=1)
+    activity["start_date"] = start.strftime("%Y-%m-%dT%H:%M:%SZ")
+    (activities_dir / "2000000000.json").write_text(json.dumps(activity))
+
+    computed = []
+    ewma_batch = pmc.ewma_batch
+    def recording(loads, *args, **kwargs):
+        computed.append(len(loads))
+        return ewma_batch(loads, *args, **kwargs)
+    monkeypatch.setattr(pmc, "ewma_batch", recording)
+    snapshot.write_snapshot(tmp_path / "after.npz", activities_dir=activities_dir)
+
+    stored = snapshot.read_snapshot(tmp_path / "after.npz")
+    assert len(computed) == 1 and computed[0] <= pmc.BLOCK_DAYS + 1 < len(stored["load"])
+    full = pmc.calculate_trends(pd.DataFrame({"date": pd.to_datetime(stored["date"]), "load": stored["load"]}))
+    assert np.array_equal(stored["ctl"], full["ctl"].to_numpy())
+    assert np.array_equal(stored["atl"], full["atl"].to_numpy())
+
+
+def test_checkpoints_are_kept_per_sport(tmp_path):
+    paths = {snapshot.trends_state_path(tmp_path), snapshot.trends_state_path(tmp_path, "Run")}
+    assert len(paths) == 2
+
+
+def banister_performances(df, ctl_days, atl_days, n, seed=0, noise=0.0):
+    rng = np.random.default_rng(seed)
+    trends = pmc.calculate_trends(df, ctl_days, atl_days)
+    days = np.sort(rng.choice(np.arange(1, len(df)), n, replace=False))
+    speed = 3.0 + 0.02 * trends["ctl"].to_numpy()[days - 1] - 0.01 * trends["atl"].to_numpy()[days - 1]
+    return pd.DataFrame({"date": df["date"].to_numpy()[days], "speed_mps": speed + rng.normal(0, noise, n)})
+
+
+def test_fit_banister_recovers_the_model():
+    df = make_load(3650)
+    fit = pmc.fit_banister(df, banister_performances(df, 35, 9, 500))
+    assert (fit["ctl_days"], fit["atl_days"]) == (35, 9)
+    assert fit["fitness_gain"] == pytest.approx(0.02)
+    assert fit["fatigue_gain"] == pytest.approx(0.01)
+    assert fit["baseline"] == pytest.approx(3.0)
+    assert fit["r2"] == pytest.approx(1.0)
+
+
+def test_fit_banister_matches_lstsq_over_the_grid():
+    df = make_load(800, seed=3)
+    perf = banister_performances(df, 20, 4, 120, seed=4, noise=0.05)
+    fit = pmc.fit_banister(df, perf, ctl_range=(15, 25), atl_range=(2, 6))
+
+    days = (perf["date"] - df["date"].iloc[0]).dt.days.to_numpy() - 1
+    best = None
+    for ctl_days in range(15, 26):
+        for atl_days in range(2, 7):
+            trends = pmc.calculate_trends(df, ctl_days, atl_days)
+            X = np.column_stack([np.ones(len(days)), trends["ctl"].to_numpy()[days], trends["atl"].to_numpy()[days]])
+            coef, *_ = np.linalg.lstsq(X, perf["speed_mps"].to_numpy(), rcond=None)
+            sse = np.sum((X @ coef - perf["speed_mps"].to_numpy()) ** 2)
+            if coef[1] > 0 and coef[2] < 0 and (best is None or sse < best[0]):
+                best = (sse, ctl_days, atl_days, coef)
+
+    sse, ctl_days, atl_days, coef = best
+    assert (fit["ctl_days"], fit["atl_days"]) == (ctl_days, atl_days)
+    assert [fit["baseline"], fit["fitness_gain"], -fit["fatigue_gain"]] == pytest.approx(coef)
+    assert fit["rmse"] == pytest.approx(np.sqrt(sse / len(days)))
+
+
+def test_fit_banister_needs_enough_performances():
+    df = make_load(400)
+    assert pmc.fit_banister(df, banister_performances(df, 42, 7, pmc.FIT_MIN_PERFORMANCES - 1)) is None
+    assert pmc.fit_banister(df, pd.DataFrame(columns=["date", "speed_mps"])) is None
@@ -0,0 +1,100 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import rollup
+from benchmarks.synthetic import generate_archive
+from load_data import get_daily_load, get_rollup
+from rollup import MEASURES, RollupCube, build_cube, period_starts, update_cube
+
+SPORTS = ["Ride", "Run", "Swim"]
+
+
+def activities(rng, n, first_day="2021-01-01", days=400):
+    return {
+        "files": np.array([f"{i}.json" for i in rng.permutation(n)]),
+        "dates": np.datetime64(first_day, "D") + rng.integers(0, days, n),
+        "sports": rng.choice(SPORTS, n),
+        "values": rng.gamma(2.0, 40.0, (n, len(MEASURES))),
+    }
+
+
+def take(acts, rows):
+    return {key: value[rows] for key, value in acts.items()}
+
+
+def test_week_starts_on_monday():
+    days = np.arange(np.datetime64("2024-02-26"), np.datetime64("2024-03-11"))
+    starts = period_starts(days, "week")
+    assert (pd.to_datetime(starts).dayofweek == 0).all()
+    assert (days - starts < np.timedelta64(7, "D")).all() and (days >= starts).all()
+    assert period_starts(days, "month")[-1] == np.datetime64("2024-03-01")
+    assert period_starts(days, "year")[0] == np.datetime64("2024-01-01")
+
+
+def test_rollups_match_groupby():
+    rng = np.random.default_rng(1)
+    acts = activities(rng, 500)
+    cube, _ = build_cube(**acts)
+
+    df = pd.DataFrame({"date": pd.to_datetime(acts["dates"]), "type": acts["sports"], "load": acts["values"][:, 0]})
+    for resolution, freq in [("week", "W-MON"), ("month", "MS"), ("year", "YS")]:
+        expected = df.groupby(pd.Grouper(key="date", freq=freq, closed="left", label="left"))["load"].sum()
+        starts, totals = cube.series("load", resolution=resolution)
+        assert np.array_equal(starts, expected.index.to_numpy().astype("datetime64[D]"))
+        assert totals == pytest.approx(expected.to_numpy())
+
+        runs = df[df["type"] == "Run"].groupby(pd.Grouper(key="date", freq=freq, closed="left", label="left"))["load"].sum()
+        starts, totals = cube.series("load", "Run", resolution)
+        assert totals[np.isin(starts, runs.index.to_numpy())] == pytest.approx(runs.to_numpy())
+    assert cube.series("distance", "Walk")[1].sum() == 0
+
+
+def test_incremental_update_matches_full_build():
+    rng = np.random.default_rng(2)
+    acts = activities(rng, 600)
+    old = take(acts, slice(0, 500))
+    cube, records = build_cube(**old)
+
+    # 100 new activities, 20 removed and 10 edited
+    new = take(acts, np.r_[20:600])
+    new["values"][5:15] *= 1.5
+    updated, records = update_cube(cube, records, **new)
+    full, _ = build_cube(**new)
+    assert np.array_equal(updated.daily, full.daily)
+    assert updated.start == full.start and updated.sports == full.sports
+
+    # Unchanged input keeps the cube
+    assert update_cube(updated, records, **new)[0] is updated
+
+
+def test_update_falls_back_on_new_sport():
+    rng = np.random.default_rng(3)
+    acts = activities(rng, 50)
+    cube, records = build_cube(**acts)
+    acts["sports"][0] = "Walk"
+    updated, _ = update_cube(cube, records, **acts)
+    assert updated.sports == SPORTS + ["Walk"]
+    assert np.array_equal(updated.daily, build_cube(**acts)[0].daily)
+
+
+def test_get_rollup_persists_and_matches_daily_load(tmp_path, monkeypatch):
+    monkeypatch.setattr("catalog.CACHE_DIR", tmp_path / "cache")
+    out_dir = generate_archive(tmp_path / "acts", 200, seed=5, streams_fraction=0.0)
+    cube = get_rollup(activities_dir=out_dir)
+    df_load = get_daily_load(activities_dir=out_dir)
+
+    days, load = cube.series("load")
+    assert np.array_equal(days, df_load["date"].to_numpy().astype("datetime64[D]"))
+    assert load == pytest.approx(df_load["load"].to_numpy())
+
+    # A second call reads the stored cube and sums no days
+    monkeypatch.setattr(rollup, "_sum_days", None)
+    assert np.array_equal(get_rollup(activities_dir=out_dir).daily, cube.daily)
+
+
+def test_empty_cube():
+    cube = RollupCube("2024-01-01", [], np.zeros((0, 0, len(MEASURES))))
+    for resolution in rollup.RESOLUTIONS:
+        starts, totals = cube.series(resolution=resolution)
+        assert len(starts) == 0 and len(totals) == 0
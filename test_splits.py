@@ -0,0 +1,67 @@
+import json
+
+import numpy as np
+import pytest
+
+from splits import SPLIT_DISTANCES, best_split_time, get_best_splits
+
+
+def brute_force(time_s, distance, target):
+    """Every stretch starting or ending on a sample, found by walking the stream."""
+    best = np.inf
+    n = len(distance)
+    for i in range(n):
+        for j in range(i + 1, n):
+            if distance[j] - distance[i] >= target:
+                d0, d1 = distance[j - 1], distance[j]
+                frac = (distance[i] + target - d0) / (d1 - d0) if d1 > d0 else 1.0
+                best = min(best, time_s[j - 1] + frac * (time_s[j] - time_s[j - 1]) - time_s[i])
+                break
+        for k in range(i - 1, -1, -1):
+            if distance[i] - distance[k] >= target:
+                d0, d1 = distance[k], distance[k + 1]
+                frac = (distance[i] - target - d0) / (d1 - d0) if d1 > d0 else 0.0
+                best = min(best, time_s[i] - (time_s[k] + frac * (time_s[k + 1] - time_s[k])))
+                break
+    return best if np.isfinite(best) else np.nan
+
+
+def make_run(n, seed):
+    rng = np.random.default_rng(seed)
+    time_s = np.cumsum(rng.integers(1, 6, n)).astype(float)
+    speed = rng.uniform(2.0, 5.0, n)
+    speed[rng.random(n) < 0.1] = 0.0  # stops
+    distance = np.cumsum(speed * np.diff(time_s, prepend=0.0))
+    return time_s, distance
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_matches_brute_force(seed):
+    time_s, distance = make_run(400, seed)
+    for target in (500.0, 1000.0, 2500.0):
+        expected = brute_force(time_s, distance, target)
+        assert best_split_time(time_s, distance, target) == pytest.approx(expected)
+
+
+def test_steady_run_with_a_fast_kilometre():
+    time_s = np.arange(0.0, 3001.0)
+    speed = np.full(len(time_s), 3.0)
+    speed[1000:1200] = 5.0
+    distance = np.concatenate([[0.0], np.cumsum(speed[1:])])
+    assert best_split_time(time_s, distance, 1000.0) == pytest.approx(200.0)
+    assert np.isnan(best_split_time(time_s, distance, 21097.5))
+
+
+def test_get_best_splits_caches_per_stream(tmp_path, monkeypatch):
+    monkeypatch.setattr("catalog.CACHE_DIR", tmp_path / "cache")
+    time_s = np.arange(0.0, 1800.0)
+    streams = [{"type": "time", "data": time_s.tolist()}, {"type": "distance", "data": (time_s * 4.0).tolist()}]
+    (tmp_path / "1_streams.json").write_text(json.dumps(streams))
+
+    splits = get_best_splits(tmp_path, ["1.json", "2.json"])
+    assert splits.shape == (2, len(SPLIT_DISTANCES))
+    assert splits[0, :2] == pytest.approx([250.0, 1250.0])
+    assert np.isnan(splits[0, 2:]).all() and np.isnan(splits[1]).all()
+
+    monkeypatch.setattr("splits.read_streams", None)  # a cache hit must not re-read the file
+    assert np.array_equal(get_best_splits(tmp_path, ["1.json", "2.json"]), splits, equal_nan=True)
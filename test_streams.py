@@ -0,0 +1,77 @@
+import json
+
+import numpy as np
+import pytest
+
+import streams
+from streams import FTP_WATTS, THRESHOLD_HR, normalized_power, resample_1hz, stream_load
+
+
+def write_streams(tmp_path, **data):
+    path = tmp_path / "1_streams.json"
+    path.write_text(json.dumps({name: {"data": values} for name, values in data.items()}))
+    return path
+
+
+def paused_ride(work_seconds, pause_seconds, interval=1):
+    """Sample times of work_seconds of riding split in two by a pause."""
+    half = np.arange(0, work_seconds // 2, interval)
+    return np.concatenate([half, half + work_seconds // 2 + pause_seconds])
+
+
+def test_normalized_power_matches_reference():
+    rng = np.random.default_rng(0)
+    watts = rng.uniform(0, 400, 1800)
+    rolling = np.convolve(watts, np.ones(30) / 30, mode="valid")
+    assert normalized_power(watts) == pytest.approx(np.mean(rolling ** 4) ** 0.25)
+
+    assert normalized_power(np.full(600, 250.0)) == pytest.approx(250.0)
+    # Variable power scores above its average
+    assert normalized_power(np.repeat([300.0, 100.0], 600)) > 200.0
+
+
+def test_one_hour_at_threshold_scores_100(tmp_path):
+    time_s = np.arange(3600)
+    assert stream_load(write_streams(tmp_path, time=time_s.tolist(), watts=[FTP_WATTS] * 3600)) == pytest.approx(100)
+    path = write_streams(tmp_path, time=time_s.tolist(), heartrate=[THRESHOLD_HR] * 3600)
+    assert stream_load(path) == pytest.approx(100, abs=0.1)
+
+
+def test_pauses_add_no_load(tmp_path):
+    # 20 minutes at threshold with an hour's stop in the middle
+    time_s = paused_ride(1200, 3600).tolist()
+    power = stream_load(write_streams(tmp_path, time=time_s, watts=[FTP_WATTS] * len(time_s)))
+    hr = stream_load(write_streams(tmp_path, time=time_s, heartrate=[THRESHOLD_HR] * len(time_s)))
+    assert power == pytest.approx(100 / 3, rel=0.01)
+    assert hr == pytest.approx(100 / 3, rel=0.01)
+
+
+def test_smart_recording_gaps_are_filled(tmp_path):
+    # A sample every 4 seconds covers the time in between
+    time_s = np.arange(0, 3604, 4)
+    watts = np.full(len(time_s), float(FTP_WATTS))
+    assert len(resample_1hz(time_s, watts)) == 3601
+    assert stream_load(write_streams(tmp_path, time=time_s.tolist(), watts=watts.tolist())) == pytest.approx(100, rel=0.01)
+    path = write_streams(tmp_path, time=time_s.tolist(), heartrate=[THRESHOLD_HR] * len(time_s))
+    assert stream_load(path) == pytest.approx(100, rel=0.01)
+
+
+def test_resample_leaves_out_pauses():
+    time_s = np.array([0, 1, 2, 5, 100, 101])
+    values = np.array([1.0, 2.0, 3.0, 6.0, 7.0, 8.0])
+    assert resample_1hz(time_s, values).tolist() == [1.0, 2.0, 3.0, 4.0, 5.0, 6.0, 7.0, 8.0]
+    assert len(resample_1hz(time_s, values, max_gap=100)) == 102
+
+
+def test_dropouts_count_as_zero_power(tmp_path):
+    watts = [FTP_WATTS] * 1800 + [None] * 1800
+    load = stream_load(write_streams(tmp_path, time=list(range(3600)), watts=watts))
+    assert load == pytest.approx(100 * normalized_power(np.repeat([FTP_WATTS, 0.0], 1800)) ** 2 / FTP_WATTS ** 2)
+    assert np.isnan(stream_load(write_streams(tmp_path, time=[0, 1], cadence=[80, 80])))
+
+
+def test_stopped_heart_rate_samples_are_skipped(tmp_path):
+    moving = [True] * 1800 + [False] * 1800
+    path = write_streams(tmp_path, time=list(range(3600)), heartrate=[THRESHOLD_HR] * 3600, moving=moving)
+    assert stream_load(path) == pytest.approx(50, abs=0.1)
+    assert streams.sample_seconds(np.array([0, 1, 2, 600, 601])).tolist() == [1, 1, 1, 1, 1]
@@ -0,0 +1,28 @@
+import numpy as np
+
+import catalog
+from benchmarks.synthetic import generate_archive
+from streams import read_streams
+
+
+def test_same_seed_same_archive(tmp_path):
+    a = generate_archive(tmp_path / "a", 40, seed=3, streams_fraction=0.5)
+    b = generate_archive(tmp_path / "b", 40, seed=3, streams_fraction=0.5)
+    names = sorted(p.name for p in a.iterdir())
+    assert names == sorted(p.name for p in b.iterdir())
+    for name in names:
+        assert (a / name).read_bytes() == (b / name).read_bytes()
+
+
+def test_archive_parses_like_a_real_one(tmp_path):
+    out_dir = generate_archive(tmp_path, 60, seed=1, streams_fraction=0.5)
+    manifest = catalog.scan_activity_files(out_dir)
+    records, skipped, errors = catalog.parse_files(out_dir, sorted(manifest))
+    assert len(records) == 60
+    assert not skipped and not errors
+
+    stream_files = sorted(out_dir.glob("*_streams.json"))
+    assert stream_files
+    streams = read_streams(stream_files[0])
+    assert {"time", "distance", "moving"} <= set(streams)
+    assert np.all(np.diff(streams["time"]) > 0)
@@ -0,0 +1,79 @@
+import json
+
+import watch
+from snapshot import source_digest
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def add_activity(directory, activity_id):
+    (directory / f"{activity_id}.json").write_text(json.dumps({"id": activity_id}))
+
+
+def make_watcher(directory, monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(watch.time, "monotonic", clock)
+    calls = []
+    watcher = watch.ActivityWatcher(
+        lambda: calls.append(source_digest(directory)),
+        built=source_digest(directory),
+        activities_dir=directory,
+        quiet_secs=2.0,
+    )
+    return watcher, clock, calls
+
+
+def test_unchanged_files_do_nothing(tmp_path, monkeypatch):
+    add_activity(tmp_path, 1)
+    watcher, clock, calls = make_watcher(tmp_path, monkeypatch)
+    for _ in range(5):
+        clock.now += 1
+        assert not watcher.poll()
+    assert calls == []
+
+
+def test_burst_of_files_triggers_one_rebuild(tmp_path, monkeypatch):
+    watcher, clock, calls = make_watcher(tmp_path, monkeypatch)
+
+    # A sync dropping files over a few polls
+    for activity_id in range(30):
+        add_activity(tmp_path, activity_id)
+        if activity_id % 10 == 9:
+            clock.now += 1
+            assert not watcher.poll()
+
+    clock.now += 1
+    assert not watcher.poll()
+    clock.now += 1
+    assert watcher.poll()
+    for _ in range(5):
+        clock.now += 1
+        assert not watcher.poll()
+
+    assert calls == [source_digest(tmp_path)]
+
+
+def test_files_changed_before_start_rebuild_at_once(tmp_path, monkeypatch):
+    watcher, clock, calls = make_watcher(tmp_path, monkeypatch)
+    watcher.built = "outdated"
+    assert watcher.poll()
+    assert len(calls) == 1
+
+
+def test_streams_file_alone_triggers_a_rebuild(tmp_path, monkeypatch):
+    add_activity(tmp_path, 1)
+    watcher, clock, calls = make_watcher(tmp_path, monkeypatch)
+
+    # Streams often sync after their summary; best splits are read from them
+    (tmp_path / "1_streams.json").write_text(json.dumps({"time": {"data": [0, 1]}}))
+    clock.now += 1
+    assert not watcher.poll()
+    clock.now += 3
+    assert watcher.poll()
+    assert calls == [source_digest(tmp_path)]
@@ -0,0 +1,68 @@
+import math
+import threading
+import time
+
+from catalog import ACTIVITIES_DIR
+from snapshot import source_digest
+
+# How often the activity directory is stat'ed
+POLL_SECONDS = 1.0
+
+# A change to the activity files only counts once they've been left alone this
+# long, so a sync dropping dozens of files at once triggers a single rebuild.
+QUIET_SECONDS = 2.0
+
+
+class ActivityWatcher:
+    """
+    Debounced watch over the activity files.
+
+    Once the files differ from the ones the current data was built from and
+    have stopped changing for quiet_secs, on_change is called (from the
+    watcher's thread when started with start()).
+    """
+
+    def __init__(self, on_change, built=None, activities_dir=ACTIVITIES_DIR, quiet_secs=QUIET_SECONDS):
+        self.on_change = on_change
+        self.activities_dir = activities_dir
+        self.quiet_secs = quiet_secs
+        # Digest the current data was built from
+        self.built = built
+        # Whatever is on disk now has been there since before we started
+        self._seen = source_digest(activities_dir)
+        self._seen_at = -math.inf
+
+    def poll(self):
+        """
+        Check the activity files once, calling on_change if they've settled on a new state.
+
+        Returns:
+            bool: True if on_change was called.
+        """
+        digest = source_digest(self.activities_dir)
+        now = time.monotonic()
+        if digest != self._seen:
+            self._seen = digest
+            self._seen_at = now
+
+        if digest == self.built or now - self._seen_at < self.quiet_secs:
+            return False
+
+        # Set first: a failing rebuild isn't retried until the files change again
+        self.built = digest
+        try:
+            self.on_change()
+        except Exception as e:
+            print(f"Error reloading activities: {e}")
+        return True
+
+    def start(self, interval_secs=POLL_SECONDS):
+        """Poll every interval_secs from a daemon thread."""
+        def run():
+            while True:
+                self.poll()
+                time.sleep(interval_secs)
+
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        return thread